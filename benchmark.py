@@ -0,0 +1,241 @@
+from draft import AutoDraft
+from draft_log import DRAFT_LOG_VERSION, analyze_draft_logs, pool_fingerprint
+from player_index import PlayerIndex
+from position_distribution import position_distribution_array
+from players import Player, assign_player_ids, get_player_list, read_player_csv, load_compiled_player_pool
+from strategy import ALL_STRATEGIES, DraftedTeam, get_strategy
+from strategy_utils import drafters_before_next_pick, get_base_positions, update_position_distribution
+from league import DEFAULT_LEAGUE
+from instrumentation import (INSTRUMENTATION, add_instrumentation_arguments, finish_instrumentation,
+                             start_instrumentation)
+from pathlib import Path
+from statistics import mean
+import argparse
+import contextlib
+import io
+import json
+import numpy as np
+import random
+import sys
+import tempfile
+import time
+import players
+
+LEAGUE_SIZES: tuple[int, ...] = (8, 10, 12, 14)
+POOL_SIZES: tuple[int, ...] = (400, 1000, 2000)
+REGRESSION_TOLERANCE: float = .2
+REPLAY_LOGS: int = 300
+# the dict distribution skips additions under 1e-5, so it drifts a little from the exact numpy one
+DISTRIBUTION_TOLERANCE: float = 1e-3
+
+
+def scaled_player_pool(pool_size: int) -> list[Player]:
+    # repeats the real pool, each repeat a little worse than the last, so bigger pools keep a realistic shape
+    base_players: list[Player] = get_player_list()
+    pool: list[Player] = []
+
+    for player_index in range(pool_size):
+        repeat, base_index = divmod(player_index, len(base_players))
+        base_player: Player = base_players[base_index]
+        name: str = base_player.name if repeat == 0 else f"{base_player.name} {repeat + 1}"
+        pool.append(Player(name, base_player.position, base_player.expected_gamely_score * .9 ** repeat))
+
+    return assign_player_ids(sorted(pool, key=lambda x: -x.expected_gamely_score))
+
+
+def time_pool_load() -> dict[str, float]:
+    csv_path: Path = Path(players.__file__).parent / "player_data.csv"
+    timings: dict[str, float] = {}
+
+    start_time: float = time.perf_counter()
+    read_player_csv()
+    timings["csv_parse_seconds"] = time.perf_counter() - start_time
+
+    get_player_list()
+    start_time = time.perf_counter()
+    load_compiled_player_pool(csv_path, csv_path.stat().st_mtime_ns)
+    timings["compiled_load_seconds"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    get_player_list()
+    timings["in_process_load_seconds"] = time.perf_counter() - start_time
+
+    return timings
+
+
+def time_log_replay(num_logs: int = REPLAY_LOGS, num_drafters: int = 12) -> dict[str, float]:
+    # full drafts in roughly adp order, each pick a little off it like a real draft, written out and re-scored
+    # the same way draft_log.py does
+    ranked_players: list[Player] = PlayerIndex(get_player_list()).ranked_players
+    header: dict = {"version": DRAFT_LOG_VERSION, "started": 0, "pool": pool_fingerprint(ranked_players),
+                    "draft_position": 0, "num_picks": num_drafters * DEFAULT_LEAGUE.num_rounds,
+                    "league": DEFAULT_LEAGUE.name,
+                    "drafters": [[f"drafter {drafter}", "greedy"] for drafter in range(num_drafters)]}
+    rng: random.Random = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths: list[Path] = []
+        for log_number in range(num_logs):
+            pick_ranks: list[int] = sorted(range(len(ranked_players)),
+                                           key=lambda rank: rank + rng.gauss(0, 15))[:header["num_picks"]]
+            path: Path = Path(directory) / f"{log_number}.log"
+            path.write_text("\n".join([json.dumps(header)] + [str(rank) for rank in pick_ranks]) + "\n",
+                            encoding="utf-8")
+            paths.append(path)
+
+        start_time: float = time.perf_counter()
+        analyze_draft_logs(paths)
+        replay_seconds: float = time.perf_counter() - start_time
+
+    return {"logs": num_logs, "replay_seconds": replay_seconds, "drafts_per_second": num_logs / replay_seconds}
+
+
+def compare_distribution_engines(league_sizes: list[int]) -> dict[str, float]:
+    # the numpy distribution of positions taken before each pick, which the predictive strategies use, against
+    # the dict one it replaced, at every pick of a greedy draft in each league size
+    picks_compared: int = 0
+    max_difference: float = 0
+
+    for num_drafters in league_sizes:
+        draft: AutoDraft = AutoDraft(get_strategy("greedy"), get_strategy("greedy"), num_drafters, 0, 0)
+        draft.print_picks = False
+        positions: list[str] = get_base_positions(draft.league)
+
+        while not draft._draft_completed():
+            drafters_between: list[DraftedTeam] = drafters_before_next_pick(draft)
+            distribution: np.ndarray = position_distribution_array(drafters_between, positions)
+            position_distribution: dict[str, dict[int, float]] = {position: {0: 1} for position in positions}
+            update_position_distribution(position_distribution, drafters_between)
+
+            for position_index, position in enumerate(positions):
+                times_taken_likelihoods: dict[int, float] = dict(enumerate(distribution[position_index].tolist()))
+                for times_taken in times_taken_likelihoods.keys() | position_distribution[position].keys():
+                    max_difference = max(max_difference, abs(times_taken_likelihoods.get(times_taken, 0)
+                                                             - position_distribution[position].get(times_taken, 0)))
+
+            picks_compared += 1
+            draft.make_pick(draft.current_drafter().strategy.strategy(draft))
+
+    return {"picks_compared": picks_compared, "max_difference": max_difference}
+
+
+def time_draft(strategy_name: str, num_drafters: int, pool: list[Player]) -> dict:
+    draft: AutoDraft = AutoDraft(get_strategy(strategy_name), get_strategy(strategy_name), num_drafters, 0, 0, pool)
+    draft.print_picks = False
+    pick_seconds_by_round: list[list[float]] = [[] for _ in range(draft.league.num_rounds)]
+
+    draft_start_time: float = time.perf_counter()
+    # strategies print as they go, which is only wanted when asked for with --debug
+    with contextlib.nullcontext() if INSTRUMENTATION.debug_output else contextlib.redirect_stdout(io.StringIO()):
+        while not draft._draft_completed():
+            drafter: DraftedTeam = draft.current_drafter()
+            round_number: int = draft.current_round_number
+
+            pick_start_time: float = time.perf_counter()
+            if INSTRUMENTATION.enabled:
+                selected_player: Player = INSTRUMENTATION.time_pick(drafter.strategy, draft)
+            else:
+                selected_player = drafter.strategy.strategy(draft)
+            pick_seconds_by_round[round_number].append(time.perf_counter() - pick_start_time)
+
+            draft.make_pick(selected_player)
+    draft_seconds: float = time.perf_counter() - draft_start_time
+
+    return {"strategy": strategy_name, "drafters": num_drafters, "pool_size": len(pool),
+            "draft_seconds": draft_seconds, "drafts_per_second": 1 / draft_seconds,
+            "mean_pick_ms_by_round": [mean(seconds) * 1000 for seconds in pick_seconds_by_round],
+            "max_pick_ms": max(max(seconds) for seconds in pick_seconds_by_round) * 1000}
+
+
+def run_benchmarks(strategy_names: list[str], league_sizes: list[int], pool_sizes: list[int],
+                   print_progress: bool = False) -> dict:
+    results: dict = {"pool_load": time_pool_load(), "log_replay": time_log_replay(),
+                     "distribution_engines": compare_distribution_engines(league_sizes), "drafts": []}
+    if print_progress:
+        print(f"replayed draft logs at {results['log_replay']['drafts_per_second']:.0f} drafts/s", file=sys.stderr)
+        print(f"distribution engines differ by at most {results['distribution_engines']['max_difference']:.2e} over "
+              f"{results['distribution_engines']['picks_compared']} picks", file=sys.stderr)
+
+    for pool_size in pool_sizes:
+        pool: list[Player] = scaled_player_pool(pool_size)
+
+        for strategy_name in strategy_names:
+            for num_drafters in league_sizes:
+                draft_result: dict = time_draft(strategy_name, num_drafters, pool)
+                results["drafts"].append(draft_result)
+
+                if print_progress:
+                    print(f"{strategy_name:<16}{num_drafters:>4} teams{pool_size:>6} players"
+                          f"{draft_result['draft_seconds']:>9.3f}s per draft{draft_result['max_pick_ms']:>10.2f}ms "
+                          "slowest pick", file=sys.stderr)
+
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list[str]:
+    regressions: list[str] = []
+    # baselines saved before failed drafts stopped being recorded may still have some, without timings
+    baseline_drafts: dict[tuple, dict] = {(draft_result["strategy"], draft_result["drafters"],
+                                           draft_result["pool_size"]): draft_result for draft_result
+                                          in baseline["drafts"] if "draft_seconds" in draft_result}
+
+    for draft_result in results["drafts"]:
+        key: tuple = (draft_result["strategy"], draft_result["drafters"], draft_result["pool_size"])
+        if key not in baseline_drafts:
+            continue
+
+        slowdown: float = draft_result["draft_seconds"] / baseline_drafts[key]["draft_seconds"]
+        if slowdown > 1 + tolerance:
+            regressions.append(f"{key[0]} with {key[1]} teams and {key[2]} players is {slowdown:.2f}x slower")
+
+    for timing, seconds in results["pool_load"].items():
+        slowdown = seconds / baseline["pool_load"][timing] if baseline["pool_load"].get(timing) else 1
+        if slowdown > 1 + tolerance:
+            regressions.append(f"pool load {timing} is {slowdown:.2f}x slower")
+
+    if "log_replay" in baseline:
+        slowdown = baseline["log_replay"]["drafts_per_second"] / results["log_replay"]["drafts_per_second"]
+        if slowdown > 1 + tolerance:
+            regressions.append(f"replaying draft logs is {slowdown:.2f}x slower")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    default_strategies: list[str] = [strategy.name for strategy in ALL_STRATEGIES
+                                     # timing a time budgeted strategy only measures its budget
+                                     if strategy.automated and not strategy.time_budgeted]
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="time every strategy's picks and full "
+                                                              "drafts across league and pool sizes")
+    parser.add_argument("--strategies", nargs="+", default=default_strategies)
+    parser.add_argument("--drafters", nargs="+", type=int, default=list(LEAGUE_SIZES))
+    parser.add_argument("--pool-sizes", nargs="+", type=int, default=list(POOL_SIZES))
+    parser.add_argument("--output", type=Path, help="write the results as json to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against results saved with --output earlier")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    add_instrumentation_arguments(parser)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    # timers and especially the profiler slow every pick down, so don't compare instrumented runs to a baseline
+    start_instrumentation(arguments)
+    results: dict = run_benchmarks(arguments.strategies, arguments.drafters, arguments.pool_sizes, True)
+    finish_instrumentation(arguments)
+
+    if arguments.output is not None:
+        arguments.output.write_text(json.dumps(results, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+
+    if results["distribution_engines"]["max_difference"] > DISTRIBUTION_TOLERANCE:
+        print(f"mismatch: the numpy and dict distributions differ by "
+              f"{results['distribution_engines']['max_difference']:.2e}", file=sys.stderr)
+        sys.exit(1)
+
+    if arguments.baseline is not None:
+        regressions: list[str] = find_regressions(results, json.loads(arguments.baseline.read_text()),
+                                                  arguments.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+
+        sys.exit(1 if regressions else 0)
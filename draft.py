@@ -1,18 +1,56 @@
+import time
+# taken before anything else is imported so the startup report covers this module's own imports
+_module_start_time: float = time.perf_counter()
+
 from players import Player, get_player_list
-from strategy import DraftedTeam, DraftStrategy, get_strategy, POSITION_NUM_MAPPING, ALL_STRATEGIES, FLEX_POSITIONS
+from player_index import PlayerIndex
+from player_lookup import PlayerLookup
+from draft_log import DraftLog, find_unfinished_draft_log, resume_draft, start_draft_log
+from speculation import RecommendationSpeculator, speculator_for
+from vor import ValueOverReplacement
+from instrumentation import (INSTRUMENTATION, add_instrumentation_arguments, finish_instrumentation,
+                             start_instrumentation)
+from strategy_common import DraftedTeam, DraftStrategy
+from league import LeagueConfig, DEFAULT_LEAGUE, ALL_LEAGUES, get_league
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Iterator, TYPE_CHECKING
+import argparse
+import threading
+
+if TYPE_CHECKING:
+    import numpy as np
+
+AVAILABLE_AT_POSITION_LIMIT: int = 31
+AUTO_STRATEGY_NAME: str = "manual_predictive"
+STARTUP_TIMINGS: dict[str, float] = {}
+
+
+def strategies() -> ModuleType:
+    # strategy pulls in numpy, so it's imported when first needed instead of before the first prompt
+    import strategy
+    return strategy
 
-NUM_DRAFT_ROUNDS: int = sum(POSITION_NUM_MAPPING.values())
-AUTO_STRATEGY: DraftStrategy = get_strategy("manual_predictive")
 
 class Draft:
-    def __init__(self, auto_init = False):
+    def __init__(self, auto_init = False, seed: "int | np.random.SeedSequence | None" = None,
+                 players: list[Player] | None = None, league: LeagueConfig | None = None):
         self.print_picks: bool = not auto_init
+        self.league: LeagueConfig = DEFAULT_LEAGUE if league is None else league
+        self.seed: "int | np.random.SeedSequence | None" = seed
+        self._rng: "np.random.Generator | None" = None
+        self._player_lookup: PlayerLookup | None = None
+        self._vor: ValueOverReplacement | None = None
+        self.log: DraftLog | None = None
+        self.speculator: RecommendationSpeculator | None = None
         self.teams: list[DraftedTeam] = []
         self.current_drafter_index: int = 0
         self.current_round_number: int = 0
-        self.available_players: list[Player] = get_player_list()
+        self.pick_history: list[tuple[int, int, Player]] = []
 
         if not auto_init:
+            mark_first_prompt()
             manual_assignment: bool = input("manually assign strategies? (y/n): ").lower() in ("y", "yes")
             self.num_drafters: int = int(input("how many drafters are there? "))
             self.draft_position: int = -1 if manual_assignment else int(input("what is your draft position? "))
@@ -22,6 +60,54 @@ class Draft:
             if manual_assignment:
                 self._assign_strategies()
 
+        # by the time the prompts are answered, a background preload has usually already read the pool
+        self.available_players: PlayerIndex = PlayerIndex(get_player_list() if players is None else players)
+        self.available_by_position: dict[str, PlayerIndex] = {}
+
+        for slot in self.league.draftable_slots:
+            self.available_by_position[slot] = PlayerIndex([player for player in self.available_players
+                                                             if self.league.plays_slot(player.position, slot)])
+
+
+    @property
+    def rng(self) -> "np.random.Generator":
+        if self._rng is None:
+            import numpy as np
+            self._rng = np.random.default_rng(self.seed)
+
+        return self._rng
+
+
+    @rng.setter
+    def rng(self, rng: "np.random.Generator") -> None:
+        self._rng = rng
+
+
+    # rollout workers get a copy of the draft, which can't hold the speculator's thread and doesn't need it
+    def __getstate__(self) -> dict:
+        state: dict = self.__dict__.copy()
+        state["speculator"] = None
+        return state
+
+
+    # only picks typed in by hand need it, so automated drafts never build it
+    @property
+    def player_lookup(self) -> PlayerLookup:
+        if self._player_lookup is None:
+            self._player_lookup = PlayerLookup(self.available_players)
+
+        return self._player_lookup
+
+
+    # built the first time a strategy asks, since the league size isn't always known when the draft is created,
+    # and kept up to date by every pick and undo from then on
+    @property
+    def vor(self) -> ValueOverReplacement:
+        if self._vor is None:
+            self._vor = ValueOverReplacement(self)
+
+        return self._vor
+
 
     def run_draft(self) -> None:
         while not self._draft_completed():
@@ -29,12 +115,17 @@ class Draft:
 
 
     def print_results(self) -> None:
-        self._sort_teams()
+        # numpy, and only needed once the draft is over
+        from season import SeasonOutlook, simulate_seasons
+
+        outlook: SeasonOutlook = simulate_seasons(self.teams, rng=self.rng)
         print("\nresults:")
 
-        for rank, team in enumerate(self.teams, 1):
-            print(f"rank {rank}: {team.drafter_name}, expected {team.expected_gamely_score():.5}"
-                    " per week. They drafted:")
+        for rank, team_index in enumerate(outlook.ranked_team_indexes(), 1):
+            team: DraftedTeam = self.teams[team_index]
+            print(f"rank {rank}: {team.drafter_name}, expected {team.expected_gamely_score():.5} per week, most points"
+                  f" in {outlook.championship_probabilities[team_index]:.1%} of seasons and wins"
+                  f" {outlook.weekly_win_rates[team_index]:.1%} of weekly matchups. They drafted:")
             
             for player in team.players:
                 print(f"{player.position} {player.name} (expected {player.expected_gamely_score} per week)")
@@ -42,16 +133,18 @@ class Draft:
 
 
     def available_at_position(self, position: str) -> list[Player]:
-        players: list[Player] = []
+        if position not in self.available_by_position:
+            return []
 
-        for player in self.available_players:
-            if player.position == position or (position == "FLEX" and player.position in FLEX_POSITIONS):
-                players.append(player)
+        return self.available_by_position[position].top(AVAILABLE_AT_POSITION_LIMIT)
+    
 
-            if len(players) > 30:
-                return players
+    def best_at_position(self, position: str) -> Player:
+        return self.available_by_position[position].best()
+    
 
-        return players
+    def nth_best_at_position(self, position: str, n: int) -> Player:
+        return self.available_by_position[position].kth_best(n)
     
 
     def current_drafter(self) -> DraftedTeam:
@@ -66,18 +159,18 @@ class Draft:
 
 
     def _draft_completed(self) -> bool:
-        return self.current_round_number >= NUM_DRAFT_ROUNDS
+        return self.current_round_number >= self.league.num_rounds
 
 
     def _assign_strategies(self):
         for drafter in self.teams:
             request_prompt: str = f"what strategy should {drafter.drafter_name} use? (options are "
-            for strategy in ALL_STRATEGIES:
+            for strategy in strategies().ALL_STRATEGIES:
                 request_prompt += f"{strategy.name}, "
             while True:
                 try:
                     selected_strategy: str = input(request_prompt[:-2] + "): ")
-                    drafter.strategy = get_strategy(selected_strategy)
+                    drafter.strategy = strategies().get_strategy(selected_strategy)
                     break
                 except ValueError as error:
                     print(error)
@@ -86,29 +179,110 @@ class Draft:
     def _assign_names(self):
         for drafter_index in range(1, self.num_drafters+1):
             if drafter_index == self.draft_position:
-                self.teams.append(DraftedTeam("You", AUTO_STRATEGY))
+                self.teams.append(DraftedTeam("You", strategies().get_strategy(AUTO_STRATEGY_NAME), self.league))
             else:
                 drafter_name: str = input(f"What is the name of drafter number {drafter_index}? ")
-                self.teams.append(DraftedTeam(drafter_name, get_strategy("manual")))
+                self.teams.append(DraftedTeam(drafter_name, strategies().get_strategy("manual"), self.league))
 
 
     def _perform_next_pick(self) -> None:
         drafter: DraftedTeam = self.teams[self.current_drafter_index]
-        selected_player: Player = drafter.strategy.strategy(self)
+        if INSTRUMENTATION.enabled:
+            selected_player: Player = INSTRUMENTATION.time_pick(drafter.strategy, self)
+        else:
+            selected_player = drafter.strategy.strategy(self)
 
-        self.available_players.remove(selected_player)
-        drafter.players.append(selected_player)
+        self._land_pick(drafter, selected_player)
 
-        self._advance_pick_number()
+
+    # everything that happens once a real pick has been decided on, however it was decided
+    def _land_pick(self, drafter: DraftedTeam, selected_player: Player) -> None:
+        self.make_pick(selected_player)
+
+        if self.log is not None:
+            self.log.record_pick(self.available_players.rank_by_player[selected_player])
+
+        if self.speculator is not None:
+            self.speculator.speculate(self)
 
         if not self.print_picks:
             return
 
         select_conjugation: str = "should select" if (drafter.drafter_name == "You"\
-                and not drafter.strategy == get_strategy("manual_predictive")) else "selected"
+                and not drafter.strategy == strategies().get_strategy("manual_predictive")) else "selected"
         print(f"{drafter.drafter_name} {select_conjugation} {selected_player.position} {selected_player.name}.\n")
 
 
+    def make_pick(self, player: Player) -> None:
+        self.pick_history.append((self.current_drafter_index, self.current_round_number, player))
+
+        self._remove_available(player)
+        self.current_drafter().add_player(player)
+
+        self._advance_pick_number()
+
+
+    def undo_pick(self) -> Player:
+        drafter_index, round_number, player = self.pick_history.pop()
+
+        self.current_drafter_index = drafter_index
+        self.current_round_number = round_number
+        self.current_drafter().remove_last_player()
+        self._restore_available(player)
+
+        return player
+
+
+    # picks are given as ranks in the pool, like in a DraftLog, and are made without asking any strategy
+    def replay(self, pick_ranks: list[int]) -> None:
+        for rank in pick_ranks:
+            self.make_pick(self.available_players.ranked_players[rank])
+
+
+    # a snapshot is just how many picks had been made, so taking one is free and rolling back only
+    # touches the picks made since
+    def snapshot(self) -> int:
+        return len(self.pick_history)
+
+
+    def rollback(self, snapshot: int) -> None:
+        while len(self.pick_history) > snapshot:
+            self.undo_pick()
+
+
+    @contextmanager
+    def lookahead(self) -> Iterator[None]:
+        snapshot: int = self.snapshot()
+        print_picks: bool = self.print_picks
+        self.print_picks = False
+
+        try:
+            yield
+        finally:
+            self.rollback(snapshot)
+            self.print_picks = print_picks
+
+
+    def _restore_available(self, player: Player) -> None:
+        self.available_players.restore(player)
+
+        for slot in self.league.eligible_slots.get(player.position, ()):
+            self.available_by_position[slot].restore(player)
+
+        if self._vor is not None:
+            self._vor.update(player.position)
+
+
+    def _remove_available(self, player: Player) -> None:
+        self.available_players.remove(player)
+
+        for slot in self.league.eligible_slots.get(player.position, ()):
+            self.available_by_position[slot].remove(player)
+
+        if self._vor is not None:
+            self._vor.update(player.position)
+
+
     def snaking_forward(self) -> bool:
         return self.current_round_number % 2 == 0
 
@@ -133,14 +307,15 @@ class Draft:
 
 class AutoDraft(Draft):
     def __init__(self, testing_strategy: DraftStrategy, others_strategy: DraftStrategy, 
-                num_drafters: int, testing_positon: int):
-        super().__init__(True)
+                num_drafters: int, testing_positon: int, seed: "int | np.random.SeedSequence | None" = None,
+                players: list[Player] | None = None, league: LeagueConfig | None = None):
+        super().__init__(True, seed, players, league)
         self.testing_strategy: DraftStrategy = testing_strategy
         self.num_drafters = num_drafters
 
         for drafter_index in range(self.num_drafters):
             strategy: DraftStrategy = testing_strategy if drafter_index == testing_positon else others_strategy
-            self.teams.append(DraftedTeam("guy " + str(drafter_index + 1), strategy))
+            self.teams.append(DraftedTeam("guy " + str(drafter_index + 1), strategy, self.league))
     
 
     def get_tested_position(self) -> int:
@@ -152,11 +327,16 @@ class AutoDraft(Draft):
         raise ValueError(f"test strategy {self.testing_strategy.name} not found")
     
 
-def get_average_result(testing_strategy: DraftStrategy, others_strategy: DraftStrategy, num_drafters: int) -> float:
+def get_average_result(testing_strategy: DraftStrategy, others_strategy: DraftStrategy, num_drafters: int,
+                       seed: int | None = None) -> float:
+    import numpy as np
+
     results: list[int] = []
+    seeds: list[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(num_drafters)
 
     for testing_position in range(num_drafters):
-        draft: AutoDraft = AutoDraft(testing_strategy, others_strategy, num_drafters, testing_position)
+        draft: AutoDraft = AutoDraft(testing_strategy, others_strategy, num_drafters, testing_position,
+                                     seeds[testing_position])
 
         draft.print_picks = False
         draft.run_draft()
@@ -167,8 +347,55 @@ def get_average_result(testing_strategy: DraftStrategy, others_strategy: DraftSt
 
 
 
-def run_draft() -> None:
-    draft: Draft = Draft()
+def mark_first_prompt() -> None:
+    if "time_to_first_prompt" not in STARTUP_TIMINGS:
+        STARTUP_TIMINGS["time_to_first_prompt"] = time.perf_counter() - _module_start_time
+
+
+def preload() -> None:
+    start_time: float = time.perf_counter()
+    strategies()
+    STARTUP_TIMINGS["background_strategy_import"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    get_player_list()
+    STARTUP_TIMINGS["background_player_pool_load"] = time.perf_counter() - start_time
+
+
+def print_startup_report() -> None:
+    print("\nstartup report (seconds):")
+    for stage, seconds in STARTUP_TIMINGS.items():
+        print(f"{stage}: {seconds:.4f}")
+
+
+def run_draft(startup_report: bool = False, league: LeagueConfig | None = None) -> None:
+    # the heavy imports and the pool load happen while the user answers the setup prompts
+    threading.Thread(target=preload, daemon=True).start()
+
+    unfinished_log: Path | None = find_unfinished_draft_log()
+    if unfinished_log is not None:
+        mark_first_prompt()
+
+    draft: Draft | None = None
+    if unfinished_log is not None and input("resume the unfinished draft? (y/n): ").lower() in ("y", "yes"):
+        try:
+            draft = resume_draft(unfinished_log)
+        except ValueError as error:
+            # most likely the player data changed since, which leaves the logged picks meaning nothing
+            print(f"couldn't resume the draft: {error}. starting a new one")
+
+    if draft is None:
+        draft = Draft(league=league)
+        draft.log = start_draft_log(draft, draft.num_drafters * draft.league.num_rounds)
+
+    # works out the bot's next recommendation while everyone else's picks are typed in
+    draft.speculator = speculator_for(draft, AUTO_STRATEGY_NAME, strategies().manual_recommendation,
+                                      strategies().patch_manual_recommendation)
+    if draft.speculator is not None:
+        draft.speculator.speculate(draft)
+
+    if startup_report:
+        print_startup_report()
 
     draft.run_draft()
 
@@ -176,7 +403,18 @@ def run_draft() -> None:
 
 
 if __name__ == "__main__":
-    run_draft()
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="run a draft, suggesting your picks")
+    parser.add_argument("--startup-report", action="store_true")
+    parser.add_argument("--league", default=DEFAULT_LEAGUE.name, choices=[league.name for league in ALL_LEAGUES])
+    add_instrumentation_arguments(parser)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    start_instrumentation(arguments)
+    try:
+        run_draft(arguments.startup_report, get_league(arguments.league))
+    finally:
+        # a draft closed partway through still reports the picks it got to
+        finish_instrumentation(arguments)
     #print(get_average_result(get_strategy("test"), get_strategy("predictive"), 10))
     # draft: AutoDraft = AutoDraft(get_strategy("predictive"), get_strategy("volatile"), 10, 4)
     # draft.print_picks = True
@@ -0,0 +1,213 @@
+from players import Player, get_player_list
+from player_index import PlayerIndex
+from strategy_common import DraftedTeam, DraftStrategy
+from league import LeagueConfig, get_league
+from pathlib import Path
+from typing import TYPE_CHECKING
+import argparse
+import hashlib
+import json
+import time
+
+if TYPE_CHECKING:
+    from draft import Draft
+
+DRAFT_LOG_DIRECTORY: Path = Path(__file__).parent / "draft_logs"
+# bump when the header or pick lines change shape, so old logs are refused instead of misread
+DRAFT_LOG_VERSION: int = 1
+
+
+class DraftLog:
+    # a json header describing the league, then one line per pick holding the picked player's rank in the pool.
+    # the file is reopened for every pick so a crash loses at most the pick being written, and so drafts holding
+    # a log can still be sent to rollout workers
+    def __init__(self, path: Path):
+        self.path: Path = path
+
+
+    def write_header(self, draft: "Draft", num_picks: int) -> None:
+        header: dict = {"version": DRAFT_LOG_VERSION, "started": time.time(),
+                        "pool": pool_fingerprint(draft.available_players.ranked_players),
+                        "draft_position": draft.draft_position, "num_picks": num_picks, "league": draft.league.name,
+                        "drafters": [[team.drafter_name, team.strategy.name] for team in draft.teams]}
+
+        with open(self.path, "w", encoding="utf-8") as writer:
+            writer.write(json.dumps(header) + "\n")
+
+
+    def record_pick(self, rank: int) -> None:
+        with open(self.path, "a", encoding="utf-8") as writer:
+            writer.write(f"{rank}\n")
+
+
+class DraftLogRecord:
+    __slots__ = ("path", "header", "pick_ranks")
+
+    def __init__(self, path: Path, header: dict, pick_ranks: list[int]):
+        self.path: Path = path
+        self.header: dict = header
+        self.pick_ranks: list[int] = pick_ranks
+
+
+    def completed(self) -> bool:
+        return len(self.pick_ranks) >= self.header["num_picks"]
+
+
+def read_draft_log(path: Path) -> DraftLogRecord:
+    lines: list[str] = path.read_text(encoding="utf-8").split("\n")
+
+    header: dict = json.loads(lines[0])
+    if header.get("version") != DRAFT_LOG_VERSION:
+        raise ValueError(f"{path} was written by a different version of the draft log")
+
+    # the last element is empty when the final pick was written out in full, and a partial pick otherwise.
+    # either way it's dropped
+    return DraftLogRecord(path, header, [int(line) for line in lines[1:-1]])
+
+
+def record_league(record: DraftLogRecord) -> LeagueConfig:
+    # logs from before leagues were configurable don't say, and were all standard leagues
+    return get_league(record.header.get("league", "standard"))
+
+
+def pool_fingerprint(ranked_players: list[Player]) -> str:
+    # picks are stored as ranks, so a log only means something against exactly the pool it was written with
+    pool_description: str = "\n".join(f"{player.name},{player.position},{player.expected_gamely_score!r}"
+                                      for player in ranked_players)
+    return hashlib.blake2b(pool_description.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def start_draft_log(draft: "Draft", num_picks: int) -> DraftLog:
+    DRAFT_LOG_DIRECTORY.mkdir(exist_ok=True)
+    draft_log: DraftLog = DraftLog(DRAFT_LOG_DIRECTORY / f"{time.strftime('%Y%m%d-%H%M%S')}.log")
+    draft_log.write_header(draft, num_picks)
+
+    return draft_log
+
+
+def find_draft_logs() -> list[Path]:
+    # named by when they started, so this is oldest first
+    if not DRAFT_LOG_DIRECTORY.exists():
+        return []
+
+    return sorted(DRAFT_LOG_DIRECTORY.glob("*.log"))
+
+
+def find_unfinished_draft_log() -> Path | None:
+    draft_logs: list[Path] = find_draft_logs()
+    if draft_logs == []:
+        return None
+
+    try:
+        record: DraftLogRecord = read_draft_log(draft_logs[-1])
+    except ValueError:
+        return None
+
+    return None if record.completed() else record.path
+
+
+def resume_draft(path: Path, players: list[Player] | None = None) -> "Draft":
+    from draft import Draft, strategies
+
+    record: DraftLogRecord = read_draft_log(path)
+    draft: Draft = Draft(True, players=players, league=record_league(record))
+    if pool_fingerprint(draft.available_players.ranked_players) != record.header["pool"]:
+        raise ValueError(f"{path} was written against a different player pool")
+
+    draft.print_picks = True
+    draft.num_drafters = len(record.header["drafters"])
+    draft.draft_position = record.header["draft_position"]
+    draft.teams = [DraftedTeam(drafter_name, strategies().get_strategy(strategy_name), draft.league)
+                   for drafter_name, strategy_name in record.header["drafters"]]
+    draft.replay(record.pick_ranks)
+
+    # rewritten so a partial last line from a crash doesn't get the next pick appended to it
+    path.write_text("\n".join([json.dumps(record.header)] + [str(rank) for rank in record.pick_ranks]) + "\n",
+                    encoding="utf-8")
+    draft.log = DraftLog(path)
+
+    return draft
+
+
+def snake_drafter_index(pick_number: int, num_drafters: int) -> int:
+    round_number, round_pick = divmod(pick_number, num_drafters)
+    return round_pick if round_number % 2 == 0 else num_drafters - round_pick - 1
+
+
+def replay_teams(record: DraftLogRecord, ranked_players: list[Player],
+                 strategies_by_name: dict[str, DraftStrategy] | None = None) -> list[DraftedTeam]:
+    # only rebuilds the rosters, skipping the availability indexes a Draft keeps, which is what makes batch
+    # analysis cheap. strategies are left as None unless they're passed in
+    if strategies_by_name is None:
+        strategies_by_name = {}
+
+    league: LeagueConfig = record_league(record)
+    teams: list[DraftedTeam] = [DraftedTeam(drafter_name, strategies_by_name.get(strategy_name), league)
+                                for drafter_name, strategy_name in record.header["drafters"]]
+
+    # a round at a time, every other one in reverse, the same order snake_drafter_index gives
+    picks_by_team: list[list[Player]] = [[] for _ in teams]
+    for round_start in range(0, len(record.pick_ranks), len(teams)):
+        round_ranks: list[int] = record.pick_ranks[round_start:round_start + len(teams)]
+        if round_start // len(teams) % 2 == 1:
+            round_ranks = [-1] * (len(teams) - len(round_ranks)) + round_ranks[::-1]
+
+        for team_picks, rank in zip(picks_by_team, round_ranks):
+            if rank >= 0:
+                team_picks.append(ranked_players[rank])
+
+    for team, picks in zip(teams, picks_by_team):
+        team.add_players(picks)
+
+    return teams
+
+
+def analyze_draft_logs(paths: list[Path], players: list[Player] | None = None) -> list[dict]:
+    ranked_players: list[Player] = PlayerIndex(get_player_list() if players is None else players).ranked_players
+    fingerprint: str = pool_fingerprint(ranked_players)
+    results: list[dict] = []
+
+    for path in paths:
+        record: DraftLogRecord = read_draft_log(path)
+        if record.header["pool"] != fingerprint:
+            results.append({"log": path.name, "error": "written against a different player pool"})
+            continue
+
+        teams: list[DraftedTeam] = replay_teams(record, ranked_players)
+        drafter_names: list[list[str]] = record.header["drafters"]
+        ranking: list[int] = sorted(range(len(teams)), key=lambda x: -teams[x].expected_gamely_score())
+
+        results.append({"log": path.name, "completed": record.completed(),
+                        "teams": [{"name": drafter_names[team_index][0], "strategy": drafter_names[team_index][1],
+                                   "rank": ranking.index(team_index) + 1,
+                                   "expected_gamely_score": teams[team_index].expected_gamely_score()}
+                                  for team_index in range(len(teams))]})
+
+    return results
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="score every team in past drafts from "
+                                                              "their logs")
+    parser.add_argument("logs", nargs="*", type=Path, help="defaults to every log in draft_logs")
+    parser.add_argument("--json", action="store_true")
+    arguments: argparse.Namespace = parser.parse_args()
+
+    start_time: float = time.perf_counter()
+    results: list[dict] = analyze_draft_logs(arguments.logs if arguments.logs != [] else find_draft_logs())
+    elapsed_seconds: float = time.perf_counter() - start_time
+
+    if arguments.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            if "error" in result:
+                print(f"{result['log']}: {result['error']}")
+                continue
+
+            print(f"{result['log']}{'' if result['completed'] else ' (unfinished)'}:")
+            for team in sorted(result["teams"], key=lambda x: x["rank"]):
+                print(f"  rank {team['rank']}: {team['name']} ({team['strategy']}), expected "
+                      f"{team['expected_gamely_score']:.5} per week")
+
+        print(f"analyzed {len(results)} drafts in {elapsed_seconds:.3f}s")
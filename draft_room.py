@@ -0,0 +1,316 @@
+from draft import AUTO_STRATEGY_NAME, Draft, strategies
+from league import LeagueConfig, DEFAULT_LEAGUE, ALL_LEAGUES, get_league
+from players import Player, get_player_list
+from player_index import PlayerIndex
+from strategy_common import DraftedTeam, DraftStrategy
+from typing import Callable, Protocol
+import argparse
+import asyncio
+import time
+
+DRAFT_ROOM_HOST: str = "127.0.0.1"
+NUM_LISTED_MATCHES: int = 5
+
+
+class PickSource(Protocol):
+    async def next_pick(self, draft: Draft) -> Player: ...
+
+
+class StrategyPickSource:
+    def __init__(self, strategy: DraftStrategy):
+        self.strategy: DraftStrategy = strategy
+
+
+    async def next_pick(self, draft: Draft) -> Player:
+        # a heavy strategy would stall every other draft in the process, so it picks on a thread. the rest are
+        # quicker than handing off to one, so they pick here after letting the other drafts have a turn
+        if self.strategy.heavy:
+            return await asyncio.to_thread(self.strategy.strategy, draft)
+
+        await asyncio.sleep(0)
+        return self.strategy.strategy(draft)
+
+
+class ConsolePickSource:
+    # someone typing picks in, through the same prompts as the regular cli. input blocks, so it waits on a
+    # thread, but only this drafter's picks do and only while they're typing
+    def __init__(self, strategy: DraftStrategy):
+        self.strategy: DraftStrategy = strategy
+
+
+    async def next_pick(self, draft: Draft) -> Player:
+        return await asyncio.to_thread(self.strategy.strategy, draft)
+
+
+class StreamPickSource:
+    # a drafter at the other end of a draft room connection. they're sent "turn <round>" and answer with a line
+    # naming their pick the way it would be typed into the cli, or with "rank <rank in pool>"
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+
+
+    async def next_pick(self, draft: Draft) -> Player:
+        self.send(f"turn {draft.current_round_number}")
+
+        while True:
+            line: bytes = await self.reader.readline()
+            if line == b"":
+                raise ConnectionError(f"{draft.current_drafter().drafter_name} disconnected")
+
+            candidates: list[Player] = self.find_pick(draft, line.decode().strip())
+            if len(candidates) == 1:
+                return candidates[0]
+
+            if candidates == []:
+                self.send("error no available player matches that")
+            else:
+                listed_matches: str = "; ".join(f"{player.position} {player.name}"
+                                                for player in candidates[:NUM_LISTED_MATCHES])
+                self.send(f"error {len(candidates)} players match: {listed_matches}")
+
+
+    def find_pick(self, draft: Draft, given_input: str) -> list[Player]:
+        words: list[str] = given_input.split()
+        if len(words) == 2 and words[0] == "rank" and words[1].isdigit():
+            if int(words[1]) >= len(draft.available_players.ranked_players):
+                return []
+
+            player: Player = draft.available_players.ranked_players[int(words[1])]
+            return [player] if player in draft.available_players else []
+
+        return draft.player_lookup.find(given_input)
+
+
+    def send(self, message: str) -> None:
+        self.writer.write(f"{message}\n".encode())
+
+
+async def run_draft_async(draft: Draft, pick_sources: list[PickSource],
+                          on_pick: Callable[[int, int, Player], None] | None = None) -> Draft:
+    # the same draft loop as Draft.run_draft, except each drafter's pick is awaited from their own source
+    while not draft._draft_completed():
+        drafter_index: int = draft.current_drafter_index
+        round_number: int = draft.current_round_number
+        drafter: DraftedTeam = draft.teams[drafter_index]
+
+        selected_player: Player = await pick_sources[drafter_index].next_pick(draft)
+        draft._land_pick(drafter, selected_player)
+
+        if on_pick is not None:
+            on_pick(drafter_index, round_number, selected_player)
+
+    return draft
+
+
+class DraftRoom:
+    # one draft on the mock server. seats without a strategy are left open for remote drafters, and the draft
+    # starts once all of them have joined
+    def __init__(self, name: str, draft: Draft, pick_sources: list[PickSource | None]):
+        self.name: str = name
+        self.draft: Draft = draft
+        self.pick_sources: list[PickSource | None] = pick_sources
+        self.remote_drafters: list[StreamPickSource] = []
+        self.all_seated: asyncio.Event = asyncio.Event()
+        self.finished: asyncio.Event = asyncio.Event()
+
+        if self.open_seats() == []:
+            self.all_seated.set()
+
+
+    def open_seats(self) -> list[int]:
+        return [seat for seat, pick_source in enumerate(self.pick_sources) if pick_source is None]
+
+
+    def seat(self, seat: int, pick_source: StreamPickSource) -> None:
+        if seat not in self.open_seats():
+            raise ValueError(f"seat {seat} in {self.name} is not open")
+
+        self.pick_sources[seat] = pick_source
+        self.remote_drafters.append(pick_source)
+        pick_source.send(f"seat {seat} {self.draft.num_drafters} {self.draft.league.name}")
+
+        if self.open_seats() == []:
+            self.all_seated.set()
+
+
+    def broadcast(self, drafter_index: int, round_number: int, player: Player) -> None:
+        rank: int = self.draft.available_players.rank_by_player[player]
+        for remote_drafter in self.remote_drafters:
+            remote_drafter.send(f"pick {drafter_index} {round_number} {rank} {player.position} {player.name}")
+
+
+    async def run(self) -> Draft:
+        await self.all_seated.wait()
+
+        try:
+            await run_draft_async(self.draft, self.pick_sources, self.broadcast)
+        finally:
+            for remote_drafter in self.remote_drafters:
+                remote_drafter.send("done")
+            self.finished.set()
+
+        return self.draft
+
+
+class DraftRoomServer:
+    # a local stand-in for a draft site, for testing. the protocol is one line per message: a client sends
+    # "join <room> <seat>", is told "seat <seat> <number of drafters> <league format>", sees every pick as
+    # "pick <drafter> <round> <rank> <position> <name>", and is sent "turn <round>" when it has to pick
+    def __init__(self):
+        self.rooms: dict[str, DraftRoom] = {}
+
+
+    def create_room(self, name: str, strategy_names: list[str | None], seed: int | None = None,
+                    players: list[Player] | None = None, league: LeagueConfig | None = None) -> DraftRoom:
+        for strategy_name in strategy_names:
+            if strategy_name is not None and strategies().get_strategy(strategy_name).time_budgeted:
+                raise ValueError(f"{strategy_name} thinks for a fixed time every pick, which would hold up every "
+                                 "other room")
+
+        draft: Draft = Draft(True, seed, players, league)
+        draft.num_drafters = len(strategy_names)
+        draft.teams = [DraftedTeam(f"guy {seat + 1}", strategies().get_strategy(strategy_name or "manual"),
+                                   draft.league) for seat, strategy_name in enumerate(strategy_names)]
+
+        pick_sources: list[PickSource | None] = [None if strategy_name is None else
+                                                 pick_source_for(strategies().get_strategy(strategy_name))
+                                                 for strategy_name in strategy_names]
+
+        self.rooms[name] = DraftRoom(name, draft, pick_sources)
+        return self.rooms[name]
+
+
+    async def serve(self, host: str = DRAFT_ROOM_HOST, port: int = 0) -> asyncio.Server:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        words: list[str] = (await reader.readline()).decode().split()
+
+        try:
+            if len(words) != 3 or words[0] != "join" or not words[2].isdigit():
+                raise ValueError("expected join <room> <seat>")
+            if words[1] not in self.rooms:
+                raise ValueError(f"there is no room called {words[1]}")
+
+            room: DraftRoom = self.rooms[words[1]]
+            room.seat(int(words[2]), StreamPickSource(reader, writer))
+        except ValueError as error:
+            writer.write(f"error {error}\n".encode())
+            writer.close()
+            return
+
+        # the room reads this drafter's picks off the connection, so it has to stay open until the draft is over
+        await room.finished.wait()
+        try:
+            await writer.drain()
+        except ConnectionError:
+            # they left before the end, which the room has already found out about
+            pass
+        writer.close()
+
+
+def pick_source_for(strategy: DraftStrategy) -> PickSource:
+    # strategies that aren't automated ask whoever's at the terminal
+    return StrategyPickSource(strategy) if strategy.automated else ConsolePickSource(strategy)
+
+
+async def run_mock_drafter(port: int, room_name: str, seat: int, strategy: DraftStrategy,
+                           players: list[Player] | None = None, host: str = DRAFT_ROOM_HOST) -> DraftedTeam:
+    # a remote drafter that follows the draft on its own copy and picks with a strategy, for exercising the server
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"join {room_name} {seat}\n".encode())
+    draft: Draft | None = None
+    pick_source: StrategyPickSource = StrategyPickSource(strategy)
+
+    try:
+        while True:
+            words: list[str] = (await reader.readline()).decode().split()
+
+            if words == [] or words[0] == "error":
+                raise ConnectionError(f"draft room {room_name} said: {' '.join(words) or 'nothing'}")
+
+            if words[0] == "seat":
+                draft = Draft(True, players=players, league=get_league(words[3]))
+                draft.print_picks = False
+                draft.num_drafters = int(words[2])
+                draft.teams = [DraftedTeam(f"guy {drafter_index + 1}", strategy, draft.league)
+                               for drafter_index in range(draft.num_drafters)]
+
+            elif words[0] == "pick":
+                draft.make_pick(draft.available_players.ranked_players[int(words[3])])
+
+            elif words[0] == "turn":
+                selected_player: Player = await pick_source.next_pick(draft)
+                writer.write(f"rank {draft.available_players.rank_by_player[selected_player]}\n".encode())
+
+            elif words[0] == "done":
+                return draft.teams[seat]
+    finally:
+        writer.close()
+
+
+async def run_mock_league(num_rooms: int, num_drafters: int, num_remote_seats: int, strategy_name: str,
+                          seed: int = 0, leagues: list[LeagueConfig] | None = None,
+                          console_seat: int | None = None) -> list[Draft]:
+    # many drafts at once in one process and one thread, with the first seats of each played over the server.
+    # rooms take turns through the given league formats, so several can be run side by side. console_seat in the
+    # first room is picked for at the terminal, with that room's picks printed as they're made
+    if leagues is None:
+        leagues = [DEFAULT_LEAGUE]
+
+    players: list[Player] = PlayerIndex(get_player_list()).ranked_players
+    server: DraftRoomServer = DraftRoomServer()
+    seat_strategy_names: list[list[str | None]] = [[None] * num_remote_seats + [strategy_name]\
+            * (num_drafters - num_remote_seats) for _ in range(num_rooms)]
+    if console_seat is not None:
+        seat_strategy_names[0][console_seat] = AUTO_STRATEGY_NAME
+
+    rooms: list[DraftRoom] = [server.create_room(f"room{room_index}", seat_strategy_names[room_index],
+                                                 seed + room_index, players, leagues[room_index % len(leagues)])
+                              for room_index in range(num_rooms)]
+    for room in rooms:
+        room.draft.print_picks = False
+    if console_seat is not None:
+        rooms[0].draft.print_picks = True
+
+    tcp_server: asyncio.Server = await server.serve()
+    port: int = tcp_server.sockets[0].getsockname()[1]
+
+    async with tcp_server:
+        mock_drafters = [run_mock_drafter(port, room.name, seat, strategies().get_strategy(strategy_name), players)
+                         for room in rooms for seat in room.open_seats()]
+        results: list = await asyncio.gather(*(room.run() for room in rooms), *mock_drafters)
+
+    return results[:num_rooms]
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="run many mock drafts at once through a "
+                                                              "local draft room server")
+    parser.add_argument("--rooms", type=int, default=12)
+    parser.add_argument("--drafters", type=int, default=10)
+    parser.add_argument("--remote-seats", type=int, default=1, help="seats per room played over a connection")
+    parser.add_argument("--strategy", default="greedy_vacant",
+                        choices=[strategy.name for strategy in strategies().ALL_STRATEGIES
+                                 if strategy.automated and not strategy.time_budgeted])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--console-seat", type=int, help="a seat in the first room to pick for yourself")
+    parser.add_argument("--league", nargs="+", default=[DEFAULT_LEAGUE.name],
+                        choices=[league.name for league in ALL_LEAGUES], help="league formats the rooms cycle through")
+    arguments: argparse.Namespace = parser.parse_args()
+
+    start_time: float = time.perf_counter()
+    drafts: list[Draft] = asyncio.run(run_mock_league(arguments.rooms, arguments.drafters, arguments.remote_seats,
+                                                      arguments.strategy, arguments.seed,
+                                                      [get_league(name) for name in arguments.league],
+                                                      arguments.console_seat))
+    elapsed_seconds: float = time.perf_counter() - start_time
+
+    for room_index, draft in enumerate(drafts):
+        best_team: DraftedTeam = max(draft.teams, key=lambda x: x.expected_gamely_score())
+        print(f"room{room_index} ({draft.league.name}): {best_team.drafter_name} won with "
+              f"{best_team.expected_gamely_score():.5} per week")
+
+    print(f"ran {len(drafts)} drafts of {arguments.drafters} in {elapsed_seconds:.3f}s")
@@ -0,0 +1,113 @@
+from strategy_utils import *
+from position_distribution import position_distribution_array, get_expected_next_score
+import numpy as np
+
+NUM_EVALUATED_CANDIDATES: int = 10
+
+
+class CandidateEvaluation:
+    __slots__ = ("player", "expected_loss", "value_over_replacement", "lineup_delta", "fills_need")
+
+    def __init__(self, player: Player, expected_loss: float, value_over_replacement: float, lineup_delta: float,
+                 fills_need: bool):
+        self.player: Player = player
+        # how much better this player is than the best we'd expect to get at their position next turn
+        self.expected_loss: float = expected_loss
+        self.value_over_replacement: float = value_over_replacement
+        # how much the drafter's projected lineup at the end of the draft goes up with this player on the roster
+        self.lineup_delta: float = lineup_delta
+        self.fills_need: bool = fills_need
+
+
+    def __str__(self) -> str:
+        return f"{self.player.position} {self.player.name}: expected loss {self.expected_loss:.3f}, " \
+               f"vor {self.value_over_replacement:.2f}, lineup {self.lineup_delta:+.2f}"
+
+
+class ManualRecommendation:
+    # what's shown at one of the user's turns, with the distribution and each position's candidates it came from
+    # kept so that a pick at one position can be patched in without working out the rest again
+    __slots__ = ("suggested_player", "expected_loss_by_position", "options", "num_positions_picked_distribution",
+                 "projected_lineup", "evaluations_by_position")
+
+    def __init__(self, suggested_player: Player, expected_loss_by_position: dict[str, float],
+                 num_positions_picked_distribution: np.ndarray, projected_lineup: Lineup,
+                 evaluations_by_position: dict[str, list[CandidateEvaluation]], num_options: int):
+        self.suggested_player: Player = suggested_player
+        self.expected_loss_by_position: dict[str, float] = expected_loss_by_position
+        self.options: list[CandidateEvaluation] = rank_candidates(evaluations_by_position, num_options)
+        self.num_positions_picked_distribution: np.ndarray = num_positions_picked_distribution
+        self.projected_lineup: Lineup = projected_lineup
+        self.evaluations_by_position: dict[str, list[CandidateEvaluation]] = evaluations_by_position
+
+
+def evaluate_candidates(draft: "Draft", num_candidates: int = NUM_EVALUATED_CANDIDATES,
+                        num_positions_picked_distribution: np.ndarray | None = None) -> list[CandidateEvaluation]:
+    return rank_candidates(evaluate_positions(draft, num_candidates, num_positions_picked_distribution),
+                           num_candidates)
+
+
+def evaluate_positions(draft: "Draft", num_candidates: int,
+                       num_positions_picked_distribution: np.ndarray | None = None,
+                       lineup: Lineup | None = None,
+                       reused_evaluations: dict[str, list[CandidateEvaluation]] | None = None)\
+        -> dict[str, list[CandidateEvaluation]]:
+    # the best few candidates at each position the current drafter could take, worked out against one distribution
+    # of what's taken before their next pick and one projected lineup. positions in reused_evaluations are taken
+    # from there as they are
+    drafter: DraftedTeam = draft.current_drafter()
+    base_positions: list[str] = get_base_positions(draft.league)
+
+    if num_positions_picked_distribution is None:
+        num_positions_picked_distribution = position_distribution_array(drafters_before_next_pick(draft),
+                                                                        base_positions)
+    if lineup is None:
+        lineup = projected_lineup(draft)
+    if reused_evaluations is None:
+        reused_evaluations = {}
+
+    considered_positions: set[str] = recommendation_positions(draft)
+    evaluations_by_position: dict[str, list[CandidateEvaluation]] = {}
+
+    for position_index, position in enumerate(base_positions):
+        if position in reused_evaluations:
+            evaluations_by_position[position] = reused_evaluations[position]
+            continue
+
+        candidates: list[Player] = draft.available_by_position[position].top(num_candidates)
+        if candidates == []:
+            continue
+
+        expected_next_score: float = get_expected_next_score(draft, num_positions_picked_distribution[position_index],
+                                                             position)
+        evaluations_by_position[position] = [CandidateEvaluation(
+                player, adjusted_expected_loss(drafter, position, player.expected_gamely_score - expected_next_score),
+                draft.vor.value(player), lineup_with_player(draft.league, lineup, player).score - lineup.score,
+                position in considered_positions) for player in candidates]
+
+    return evaluations_by_position
+
+
+def projected_lineup(draft: "Draft") -> Lineup:
+    # the current drafter's best lineup at the end of the draft, taking every spot they could still start someone
+    # in to be filled by the replacement level player at its position, the best that's sure to be left late
+    drafter: DraftedTeam = draft.current_drafter()
+    replacement_players: list[Player] = [
+            Player("replacement", position, draft.vor.replacement_score(position))
+            for position, max_starters in draft.league.max_starters.items() for _ in range(max_starters)]
+
+    return best_lineup(draft.league, drafter.players + replacement_players)
+
+
+def rank_candidates(evaluations_by_position: dict[str, list[CandidateEvaluation]],
+                    num_candidates: int) -> list[CandidateEvaluation]:
+    # ranked the same way the predictive recommendation chooses, so the first one is always the player it suggests:
+    # positions it would consider first, then by adjusted expected loss, or by projection if it wouldn't consider any
+    evaluations: list[CandidateEvaluation] = [evaluation for position_evaluations in evaluations_by_position.values()
+                                              for evaluation in position_evaluations]
+
+    if not any(evaluation.fills_need for evaluation in evaluations):
+        evaluations.sort(key=lambda x: -x.player.expected_gamely_score)
+    else:
+        evaluations.sort(key=lambda x: (not x.fills_need, -x.expected_loss))
+    return evaluations[:num_candidates]
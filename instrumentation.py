@@ -0,0 +1,212 @@
+from pathlib import Path
+from typing import Callable, TYPE_CHECKING
+import argparse
+import json
+import sys
+import time
+
+# the profiler is only loaded once something asks for it, so every command's startup doesn't pay for it
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+    from draft import Draft
+    from players import Player
+    from strategy_common import DraftStrategy
+
+
+class Instrumentation:
+    # everything is behind the enabled flag, so when it's off the hot path pays one attribute check
+    def __init__(self):
+        self.enabled: bool = False
+        self.debug_output: bool = False
+        self.profiler: "cProfile.Profile | None" = None
+        self.counters: dict[str, int] = {}
+        self.pick_seconds: dict[str, list[float]] = {}
+        self.caches: dict[str, Callable] = {}
+        self.cache_baselines: dict[str, tuple[int, int]] = {}
+        # recorded by other processes, e.g. tournament workers, and reported along with this one's
+        self.merged_cache_counts: dict[str, tuple[int, int, int]] = {}
+        self.merged_profile_stats: dict = {}
+
+
+    def enable(self, profile: bool = False) -> None:
+        self.enabled = True
+        if profile and self.profiler is None:
+            import cProfile
+            self.profiler = cProfile.Profile()
+
+
+    def disable(self) -> None:
+        self.enabled = False
+
+
+    def reset(self) -> None:
+        self.counters = {}
+        self.pick_seconds = {}
+        if self.profiler is not None:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.merged_cache_counts = {}
+        self.merged_profile_stats = {}
+
+        for name in self.caches:
+            self._mark_cache_baseline(name)
+
+
+    # caches are lru_cache wrapped functions. their hits and misses are reported relative to the last reset,
+    # since clearing them to restart the counts would throw away the work they hold
+    def register_cache(self, name: str, cache: Callable) -> None:
+        self.caches[name] = cache
+        self._mark_cache_baseline(name)
+
+
+    def _mark_cache_baseline(self, name: str) -> None:
+        cache_info = self.caches[name].cache_info()
+        self.cache_baselines[name] = (cache_info.hits, cache_info.misses)
+
+
+    # hits and misses since the last reset and the current size, counting what was merged in from other processes
+    def _cache_counts(self, name: str) -> tuple[int, int, int]:
+        cache_info = self.caches[name].cache_info()
+        baseline_hits, baseline_misses = self.cache_baselines[name]
+        merged_hits, merged_misses, merged_size = self.merged_cache_counts.get(name, (0, 0, 0))
+
+        return (cache_info.hits - baseline_hits + merged_hits, cache_info.misses - baseline_misses + merged_misses,
+                max(cache_info.currsize, merged_size))
+
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+
+    def time_pick(self, strategy: "DraftStrategy", draft: "Draft") -> "Player":
+        start_time: float = time.perf_counter()
+
+        if self.profiler is not None:
+            self.profiler.enable()
+            try:
+                selected_player: "Player" = strategy.strategy(draft)
+            finally:
+                self.profiler.disable()
+        else:
+            selected_player = strategy.strategy(draft)
+
+        self.pick_seconds.setdefault(strategy.name, []).append(time.perf_counter() - start_time)
+        self.count("picks")
+
+        return selected_player
+
+
+    def to_dict(self) -> dict:
+        pick_timers: dict[str, dict[str, float]] = {}
+        for strategy_name, seconds in self.pick_seconds.items():
+            pick_timers[strategy_name] = {"picks": len(seconds), "total_seconds": sum(seconds),
+                                          "mean_seconds": sum(seconds) / len(seconds), "max_seconds": max(seconds)}
+
+        cache_statistics: dict[str, dict[str, int | None]] = {}
+        for name, cache in self.caches.items():
+            hits, misses, size = self._cache_counts(name)
+            cache_statistics[name] = {"hits": hits, "misses": misses, "size": size,
+                                      "max_size": cache.cache_info().maxsize}
+
+        return {"counters": dict(self.counters), "pick_timers": pick_timers, "caches": cache_statistics}
+
+
+    # everything recorded since the last reset, in a form a worker process can send back to be merged
+    def snapshot(self) -> dict:
+        profile_stats: dict = {}
+        if self.profiler is not None:
+            self.profiler.create_stats()
+            profile_stats = self.profiler.stats
+
+        return {"counters": dict(self.counters), "pick_seconds": self.pick_seconds,
+                "cache_counts": {name: self._cache_counts(name) for name in self.caches},
+                "profile_stats": profile_stats}
+
+
+    def merge(self, snapshot: dict) -> None:
+        for counter, amount in snapshot["counters"].items():
+            self.count(counter, amount)
+
+        for strategy_name, seconds in snapshot["pick_seconds"].items():
+            self.pick_seconds.setdefault(strategy_name, []).extend(seconds)
+
+        for name, (hits, misses, size) in snapshot["cache_counts"].items():
+            merged_hits, merged_misses, merged_size = self.merged_cache_counts.get(name, (0, 0, 0))
+            self.merged_cache_counts[name] = (merged_hits + hits, merged_misses + misses, max(merged_size, size))
+
+        add_profile_stats(self.merged_profile_stats, snapshot["profile_stats"])
+
+
+    def profile_stats(self) -> "pstats.Stats":
+        import pstats
+
+        if self.profiler is None:
+            raise ValueError("profiling was not enabled")
+
+        self.profiler.create_stats()
+        profile_stats: dict = dict(self.merged_profile_stats)
+        add_profile_stats(profile_stats, self.profiler.stats)
+        if profile_stats == {}:
+            raise ValueError("no picks were profiled")
+
+        return pstats.Stats(MergedProfile(profile_stats))
+
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+
+    def write_profile(self, path: Path) -> None:
+        self.profile_stats().dump_stats(path)
+
+
+    def print_profile(self, num_lines: int = 25) -> None:
+        self.profile_stats().sort_stats("cumulative").print_stats(num_lines)
+
+
+def add_profile_stats(profile_stats: dict, other_stats: dict) -> None:
+    if other_stats == {}:
+        return
+
+    import pstats
+    for function, function_stats in other_stats.items():
+        profile_stats[function] = pstats.add_func_stats(profile_stats.get(function, (0, 0, 0, 0, {})), function_stats)
+
+
+class MergedProfile:
+    # profile stats put together from several profilers, in the shape pstats reads a profiler's results from
+    def __init__(self, stats: dict):
+        self.stats: dict = stats
+
+
+    def create_stats(self) -> None:
+        pass
+
+
+INSTRUMENTATION: Instrumentation = Instrumentation()
+
+
+def add_instrumentation_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--instrument", type=Path, metavar="PATH",
+                        help="write per pick timers, counters and cache statistics to this json file")
+    parser.add_argument("--profile", type=Path, metavar="PATH", help="write a cProfile of every pick to this file")
+    parser.add_argument("--debug", action="store_true",
+                        help="print what the strategies work out on the way to every pick")
+
+
+def start_instrumentation(arguments: argparse.Namespace) -> None:
+    INSTRUMENTATION.debug_output = arguments.debug
+    if arguments.instrument is not None or arguments.profile is not None:
+        INSTRUMENTATION.enable(arguments.profile is not None)
+        INSTRUMENTATION.reset()
+
+
+def finish_instrumentation(arguments: argparse.Namespace) -> None:
+    if arguments.instrument is not None:
+        INSTRUMENTATION.write_json(arguments.instrument)
+    if arguments.profile is not None:
+        try:
+            INSTRUMENTATION.write_profile(arguments.profile)
+        except ValueError as error:
+            print(f"no profile written: {error}", file=sys.stderr)
@@ -0,0 +1,163 @@
+BENCH_SLOT: str = "BENCH"
+
+# how much drafters want to fill each position's starting spots, relative to the others
+DEFAULT_POSITION_IMPORTANCES: dict[str, float] = {"QB": 1.25, "WR": 1.5, "RB": 1.5, "TE": .75, "AR": .001, "SK": .001,
+                                                  "DL": .5, "LB": .5, "DB": .5}
+# the bit of need a position with its own spots full still has while a flex spot it could go in is empty
+DEFAULT_FLEX_IMPORTANCES: dict[str, float] = {"WR": .8, "RB": .4, "TE": .05, "QB": .8, "DL": .4, "LB": .4, "DB": .4}
+# how many of each position drafters end up with once they're only drafting backups
+DEFAULT_BACKUP_CAPS: dict[str, int] = {"QB": 3, "WR": 7, "RB": 6, "TE": 3, "AR": 2, "SK": 2, "DL": 3, "LB": 3, "DB": 3}
+# the share of picks that go to each position, for strategies that don't look at anyone's roster
+DEFAULT_DRAFT_SHARES: dict[str, float] = {"QB": .175, "RB": .35, "WR": .35, "TE": .15, "SK": .07, "AR": .07,
+                                          "DL": .1, "LB": .1, "DB": .1}
+
+
+class LeagueConfig:
+    # a league's roster shape, compiled once into the tables drafting looks things up in. slots are the keys of
+    # slot_counts in order, each either a position, a flex slot (a key of flex_slots) or the bench
+    def __init__(self, name: str, slot_counts: dict[str, int], flex_slots: dict[str, tuple[str, ...]],
+                 unscored_positions: tuple[str, ...] = ("AR", "SK"),
+                 position_importances: dict[str, float] | None = None,
+                 flex_importances: dict[str, float] | None = None, backup_caps: dict[str, int] | None = None,
+                 draft_shares: dict[str, float] | None = None):
+        self.name: str = name
+        self.slot_counts: dict[str, int] = dict(slot_counts)
+        self.flex_slots: dict[str, tuple[str, ...]] = dict(flex_slots)
+        # kickers and defenses don't count towards a team's expected score, and drafters start on backups
+        # without them
+        self.unscored_positions: tuple[str, ...] = unscored_positions
+
+        self.slots: tuple[str, ...] = tuple(self.slot_counts)
+        self.positions: tuple[str, ...] = tuple(slot for slot in self.slots
+                                                if slot not in self.flex_slots and slot != BENCH_SLOT)
+        # every slot a player can be drafted for, which is every slot but the bench
+        self.draftable_slots: tuple[str, ...] = tuple(slot for slot in self.slots if slot != BENCH_SLOT)
+        self.flex_positions: tuple[str, ...] = tuple(position for position in self.positions
+                                                     if any(position in eligible_positions
+                                                            for eligible_positions in self.flex_slots.values()))
+        self.num_rounds: int = sum(self.slot_counts.values())
+
+        for flex_slot, eligible_positions in self.flex_slots.items():
+            if flex_slot not in self.slot_counts or any(position not in self.positions
+                                                        for position in eligible_positions):
+                raise ValueError(f"flex slot {flex_slot} must be in slot_counts and only hold positions that are")
+
+        self.slot_index: dict[str, int] = {slot: slot_index for slot_index, slot in enumerate(self.slots)}
+        # bit i is set when the position can fill self.slots[i]
+        self.eligibility_masks: dict[str, int] = {position: 1 << self.slot_index[position]
+                                                  for position in self.positions}
+        for flex_slot, eligible_positions in self.flex_slots.items():
+            for position in eligible_positions:
+                self.eligibility_masks[position] |= 1 << self.slot_index[flex_slot]
+        # the same thing as the slots themselves, for the per pick work that walks every slot a player fills
+        self.eligible_slots: dict[str, tuple[str, ...]] = {
+                position: tuple(slot for slot in self.draftable_slots if self.plays_slot(position, slot))
+                for position in self.positions}
+
+        # flex slots are filled narrowest first, so a player who fits in either goes where fewer others could
+        self.flex_fill_order: tuple[str, ...] = tuple(sorted(self.flex_slots, key=lambda x: len(self.flex_slots[x])))
+        # the slots whose starters make up a team's expected score, with how many starters each has
+        self.scored_slots: tuple[tuple[str, int], ...] = tuple(
+                (slot, count) for slot, count in self.slot_counts.items() if slot != BENCH_SLOT
+                and slot not in self.unscored_positions)
+        # the scored slots each position can start in, which is all a lineup is solved over
+        self.lineup_slots: dict[str, tuple[str, ...]] = {
+                position: tuple(slot for slot in self.eligible_slots[position] if slot in dict(self.scored_slots))
+                for position in self.positions}
+        # every scored slot a position's players could end up in by moving other starters around. when all of them
+        # are full, another player at the position can't start
+        self.connected_slots: dict[str, tuple[str, ...]] = {
+                position: connected_slots(self.lineup_slots, position) for position in self.positions}
+        # the most players at each position that can start at once, so only a position's best few need solving over
+        self.max_starters: dict[str, int] = {
+                position: sum(self.slot_counts[slot] for slot in self.lineup_slots[position])
+                for position in self.positions}
+
+        self.position_importances: dict[str, float] = lookup_table(self.positions, position_importances,
+                                                                   DEFAULT_POSITION_IMPORTANCES, 1)
+        self.flex_importances: dict[str, float] = lookup_table(self.flex_positions, flex_importances,
+                                                               DEFAULT_FLEX_IMPORTANCES, .4)
+        self.backup_caps: dict[str, int] = lookup_table(self.positions, backup_caps, DEFAULT_BACKUP_CAPS, 2)
+        self.draft_shares: dict[str, float] = lookup_table(self.positions, draft_shares, DEFAULT_DRAFT_SHARES, .1)
+
+
+    def __repr__(self) -> str:
+        return f"LeagueConfig({self.name!r})"
+
+
+    # the formats below unpickle as themselves, so rollout workers handed a draft share the caches keyed on them
+    def __reduce__(self) -> tuple:
+        if any(league is self for league in ALL_LEAGUES):
+            return (get_league, (self.name,))
+
+        return super().__reduce__()
+
+
+    def plays_slot(self, position: str, slot: str) -> bool:
+        return self.eligibility_masks.get(position, 0) >> self.slot_index[slot] & 1 == 1
+
+
+    def flex_counts(self, num_at_position: dict[str, int]) -> dict[str, int]:
+        # how many players are competing for each flex slot, from position counts alone. a slot's competitors are
+        # the players its positions have beyond their own starting spots, less whoever starts in a narrower flex
+        # slot inside it
+        overflow: dict[str, int] = {position: max(num_at_position[position] - self.slot_counts[position], 0)
+                                    for position in self.flex_positions}
+        counts: dict[str, int] = {}
+
+        for flex_slot in self.flex_fill_order:
+            eligible_positions: tuple[str, ...] = self.flex_slots[flex_slot]
+            counts[flex_slot] = sum(overflow[position] for position in eligible_positions)
+
+            for narrower_slot in counts:
+                if narrower_slot != flex_slot and set(self.flex_slots[narrower_slot]) <= set(eligible_positions):
+                    counts[flex_slot] -= min(counts[narrower_slot], self.slot_counts[narrower_slot])
+
+            counts[flex_slot] = max(counts[flex_slot], 0)
+
+        return counts
+
+
+def connected_slots(lineup_slots: dict[str, tuple[str, ...]], position: str) -> tuple[str, ...]:
+    slots: list[str] = list(lineup_slots[position])
+    for slot in slots:
+        for other_position, other_slots in lineup_slots.items():
+            if slot in other_slots:
+                slots.extend(other_slot for other_slot in other_slots if other_slot not in slots)
+
+    return tuple(slots)
+
+
+def lookup_table(positions: tuple[str, ...], given: dict | None, defaults: dict, fallback: float | int) -> dict:
+    table: dict = {position: defaults.get(position, fallback) for position in positions}
+    table.update(given or {})
+
+    return table
+
+
+STANDARD_LEAGUE: LeagueConfig = LeagueConfig("standard", {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "AR": 1,
+                                                          "SK": 1, "BENCH": 7}, {"FLEX": ("WR", "RB", "TE")})
+SUPERFLEX_LEAGUE: LeagueConfig = LeagueConfig("superflex", {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1,
+                                                            "SUPERFLEX": 1, "AR": 1, "SK": 1, "BENCH": 6},
+                                              {"FLEX": ("WR", "RB", "TE"), "SUPERFLEX": ("QB", "WR", "RB", "TE")})
+TWO_TE_LEAGUE: LeagueConfig = LeagueConfig("two_te", {"QB": 1, "RB": 2, "WR": 2, "TE": 2, "FLEX": 1, "AR": 1,
+                                                      "SK": 1, "BENCH": 6}, {"FLEX": ("WR", "RB", "TE")})
+DEEP_BENCH_LEAGUE: LeagueConfig = LeagueConfig("deep_bench", {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1,
+                                                              "AR": 1, "SK": 1, "BENCH": 10},
+                                               {"FLEX": ("WR", "RB", "TE")})
+# player_data.csv has no defensive players, so this needs a pool with IDP projections, e.g. from projections.py
+IDP_LEAGUE: LeagueConfig = LeagueConfig("idp", {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "DL": 2, "LB": 2,
+                                                "DB": 2, "IDP": 1, "SK": 1, "BENCH": 6},
+                                        {"FLEX": ("WR", "RB", "TE"), "IDP": ("DL", "LB", "DB")},
+                                        unscored_positions=("SK",))
+
+DEFAULT_LEAGUE: LeagueConfig = STANDARD_LEAGUE
+ALL_LEAGUES: list[LeagueConfig] = [STANDARD_LEAGUE, SUPERFLEX_LEAGUE, TWO_TE_LEAGUE, DEEP_BENCH_LEAGUE, IDP_LEAGUE]
+
+
+def get_league(name: str) -> LeagueConfig:
+    for league in ALL_LEAGUES:
+        if name == league.name:
+            return league
+
+    raise ValueError(f"{name} is not the name of a league format.")
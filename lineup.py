@@ -0,0 +1,146 @@
+from players import Player
+from league import LeagueConfig
+from collections import deque
+from functools import cache
+from operator import attrgetter
+import math
+
+
+class Lineup:
+    # the starters filling each of a league's scored slots. never changed once built, so a team can keep the
+    # lineup it had before each of its picks and go back to one for free when a pick is undone
+    __slots__ = ("starters", "score")
+
+    def __init__(self, starters: dict[str, tuple[Player, ...]]):
+        self.starters: dict[str, tuple[Player, ...]] = starters
+        # summed exactly so the score doesn't depend on which slot each starter ended up in
+        self.score: float = math.fsum(player.expected_gamely_score for slot_starters in starters.values()
+                                      for player in slot_starters)
+
+
+# lineups are never changed, so every team in a league can start from the same empty one
+@cache
+def empty_lineup(league: LeagueConfig) -> Lineup:
+    return Lineup({slot: () for slot, _ in league.scored_slots})
+
+
+def lineup_with_player(league: LeagueConfig, lineup: Lineup, player: Player) -> Lineup:
+    # the best lineup once player joins a roster whose best lineup was lineup. rosters and the starters they can
+    # field make a transversal matroid, so the best lineup is built by adding players best first, and adding one
+    # to an optimal lineup only ever takes an augmenting path to an open slot, or swaps out the worst starter that
+    # some alternating path reaches
+    starters: dict[str, tuple[Player, ...]] = lineup.starters
+    came_from, open_slot = augmenting_path(league, starters, player)
+
+    # only the slots along the path change, the rest are shared with the lineup this was built from
+    new_starters: dict[str, tuple[Player, ...]] = dict(starters)
+
+    if open_slot is None:
+        # every slot player could get to is full, so they only start in place of the worst starter they can reach
+        reachable: list[tuple[Player, str]] = [(starter, slot) for slot in came_from for starter in starters[slot]]
+        if reachable == []:
+            return lineup
+
+        worst_starter, open_slot = min(reachable, key=lambda x: x[0].expected_gamely_score)
+        if worst_starter.expected_gamely_score >= player.expected_gamely_score:
+            return lineup
+
+        new_starters[open_slot] = without(new_starters[open_slot], worst_starter)
+
+    # shift everyone along the path into the slot that was opened, and player into the slot it starts from
+    slot = open_slot
+    while came_from[slot] is not None:
+        previous_slot, moving_starter = came_from[slot]
+        new_starters[previous_slot] = without(new_starters[previous_slot], moving_starter)
+        new_starters[slot] += (moving_starter,)
+        slot = previous_slot
+
+    new_starters[slot] += (player,)
+
+    return Lineup(new_starters)
+
+
+def augmenting_path(league: LeagueConfig, starters: dict[str, tuple[Player, ...]] | dict[str, list[Player]],
+                    player: Player) -> tuple[dict[str, tuple[str, Player] | None], str | None]:
+    # a breadth first search from player's slots to one with room, moving starters along the way. came_from[slot]
+    # is the slot the player moving into it starts in now, and that player, or None for player. the open slot is
+    # None if every slot reachable is full
+    starting_slots: dict[str, tuple[str, ...]] = league.lineup_slots
+    slot_counts: dict[str, int] = league.slot_counts
+
+    came_from: dict[str, tuple[str, Player] | None] = {}
+    frontier: deque[str] = deque()
+    for slot in starting_slots.get(player.position, ()):
+        came_from[slot] = None
+        frontier.append(slot)
+
+    while frontier:
+        slot: str = frontier.popleft()
+        if len(starters[slot]) < slot_counts[slot]:
+            return came_from, slot
+
+        for starter in starters[slot]:
+            for next_slot in starting_slots[starter.position]:
+                if next_slot not in came_from:
+                    came_from[next_slot] = (slot, starter)
+                    frontier.append(next_slot)
+
+    return came_from, None
+
+
+def without(starters: tuple[Player, ...], player: Player) -> tuple[Player, ...]:
+    return tuple(starter for starter in starters if starter is not player)
+
+
+def best_lineup(league: LeagueConfig, players: list[Player]) -> Lineup:
+    # one greedy pass, best first, into lists that are only turned into a Lineup at the end. everyone already
+    # starting is at least as good as player, so player starts if there's a path to an open slot and never does
+    # otherwise. players at a position can all start in the same slots, so once one of them can't, none after
+    # them can either, and none can once every slot they're connected to is full
+    starting_slots: dict[str, tuple[str, ...]] = league.lineup_slots
+    starters: dict[str, list[Player]] = {slot: [] for slot, _ in league.scored_slots}
+    room: dict[str, int] = dict(league.scored_slots)
+    open_slots: int = sum(room.values())
+    full_positions: set[str] = set()
+
+    for player in sorted(players, key=attrgetter("expected_gamely_score"), reverse=True):
+        if open_slots == 0:
+            break
+        if player.position in full_positions:
+            continue
+
+        # most players go straight into one of their own slots, which doesn't need a search
+        open_slot: str | None = None
+        for slot in starting_slots.get(player.position, ()):
+            if room[slot] > 0:
+                open_slot = slot
+                break
+
+        if open_slot is not None:
+            starters[open_slot].append(player)
+            room[open_slot] -= 1
+            open_slots -= 1
+            continue
+
+        if all(room[slot] == 0 for slot in league.connected_slots.get(player.position, ())):
+            full_positions.add(player.position)
+            continue
+
+        came_from, open_slot = augmenting_path(league, starters, player)
+        if open_slot is None:
+            full_positions.add(player.position)
+            continue
+
+        room[open_slot] -= 1
+
+        slot: str = open_slot
+        while came_from[slot] is not None:
+            previous_slot, moving_starter = came_from[slot]
+            starters[previous_slot].remove(moving_starter)
+            starters[slot].append(moving_starter)
+            slot = previous_slot
+
+        starters[slot].append(player)
+        open_slots -= 1
+
+    return Lineup({slot: tuple(slot_starters) for slot, slot_starters in starters.items()})
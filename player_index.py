@@ -0,0 +1,117 @@
+from players import Player
+from typing import Iterator
+
+
+class PlayerIndex:
+    # players ranked best to worst once, with removals tracked in a fenwick tree of availability so the
+    # k-th best available player can be found without rescanning the pool
+    __slots__ = ("ranked_players", "rank_by_player", "available", "num_available", "first_available_rank", "_tree")
+
+    def __init__(self, players: list[Player]):
+        self.ranked_players: list[Player] = sorted(players, key=lambda x: -x.expected_gamely_score)
+        self.rank_by_player: dict[Player, int] = {player: rank for rank, player in enumerate(self.ranked_players)}
+        self.available: list[bool] = [True] * len(self.ranked_players)
+        self.num_available: int = len(self.ranked_players)
+        self.first_available_rank: int = 0
+
+        self._tree: list[int] = [0] + [1] * len(self.ranked_players)
+        for tree_index in range(1, len(self._tree)):
+            parent_index: int = tree_index + (tree_index & -tree_index)
+            if parent_index < len(self._tree):
+                self._tree[parent_index] += self._tree[tree_index]
+
+
+    def __len__(self) -> int:
+        return self.num_available
+
+
+    def __contains__(self, player: Player) -> bool:
+        rank: int | None = self.rank_by_player.get(player)
+        return rank is not None and self.available[rank]
+
+
+    def __iter__(self) -> Iterator[Player]:
+        for rank in range(self.first_available_rank, len(self.ranked_players)):
+            if self.available[rank]:
+                yield self.ranked_players[rank]
+
+
+    def __getitem__(self, key: int | slice) -> Player | list[Player]:
+        if isinstance(key, slice):
+            return list(self)[key]
+
+        if key < 0:
+            key += self.num_available
+        return self.kth_best(key)
+
+
+    def best(self) -> Player:
+        if self.num_available == 0:
+            raise IndexError("no players available")
+
+        return self.ranked_players[self.first_available_rank]
+
+
+    def kth_best(self, k: int) -> Player:
+        if k < 0 or k >= self.num_available:
+            raise IndexError(f"only {self.num_available} players available, asked for index {k}")
+
+        if k == 0:
+            return self.best()
+
+        # walk down the fenwick tree to the rank with exactly k available players before it
+        rank: int = 0
+        remaining: int = k + 1
+        step: int = 1 << (len(self.ranked_players).bit_length() - 1)
+        while step > 0:
+            next_rank: int = rank + step
+            if next_rank < len(self._tree) and self._tree[next_rank] < remaining:
+                rank = next_rank
+                remaining -= self._tree[next_rank]
+            step >>= 1
+
+        return self.ranked_players[rank]
+
+
+    def top(self, count: int) -> list[Player]:
+        players: list[Player] = []
+
+        for player in self:
+            if len(players) >= count:
+                break
+            players.append(player)
+
+        return players
+
+
+    def remove(self, player: Player) -> None:
+        if player not in self:
+            raise ValueError(f"{player} is not available")
+
+        rank: int = self.rank_by_player[player]
+        self.available[rank] = False
+        self.num_available -= 1
+
+        tree_index: int = rank + 1
+        while tree_index < len(self._tree):
+            self._tree[tree_index] -= 1
+            tree_index += tree_index & -tree_index
+
+        while self.first_available_rank < len(self.ranked_players) and not self.available[self.first_available_rank]:
+            self.first_available_rank += 1
+
+
+    def restore(self, player: Player) -> None:
+        if player in self:
+            raise ValueError(f"{player} is already available")
+
+        rank: int = self.rank_by_player[player]
+        self.available[rank] = True
+        self.num_available += 1
+
+        tree_index: int = rank + 1
+        while tree_index < len(self._tree):
+            self._tree[tree_index] += 1
+            tree_index += tree_index & -tree_index
+
+        self.first_available_rank = min(self.first_available_rank, rank)
@@ -0,0 +1,116 @@
+from players import Player
+from player_index import PlayerIndex
+from bisect import bisect_left
+import re
+
+POSITION_ENTRY_ALIASES: dict[str, str] = {"K": "SK", "D": "AR", "D/ST": "AR", "DST": "AR", "DEF": "AR"}
+NUM_FUZZY_MATCHES: int = 5
+FUZZY_MATCH_CUTOFF: float = .6
+
+
+class PlayerLookup:
+    # built once per draft over the whole pool. drafted players aren't taken out of it, every lookup is instead
+    # checked against the draft's own availability index, which keeps it right through undos and rollbacks
+    # without making picks do any extra work
+    def __init__(self, available_players: PlayerIndex):
+        self.available_players: PlayerIndex = available_players
+        self.positions: set[str] = {player.position for player in available_players.ranked_players}
+        # every key's players are best first, since they're added in rank order
+        self.players_by_initials: dict[tuple[str, str], list[Player]] = {}
+        self.players_by_name: dict[str, list[Player]] = {}
+        # (normalized name from one of its words to the end, rank), sorted so prefixes can be found by bisection
+        self.name_suffixes: list[tuple[str, int]] = []
+
+        for rank, player in enumerate(available_players.ranked_players):
+            for initials in player_initials(player.name):
+                self.players_by_initials.setdefault((player.position, initials), []).append(player)
+
+            name_words: list[str] = normalize_name(player.name).split()
+            self.players_by_name.setdefault(" ".join(name_words), []).append(player)
+            for word_index in range(len(name_words)):
+                self.name_suffixes.append((" ".join(name_words[word_index:]), rank))
+
+        self.name_suffixes.sort()
+
+
+    def find(self, given_input: str) -> list[Player]:
+        # accepts "<position> <initials>", "<position> <name>" or just the start of a name, and returns every
+        # available player it could mean, best first
+        position, words = self.split_position(given_input)
+        if words == []:
+            return []
+
+        if position is not None and len(words) == 1:
+            candidates: list[Player] = self.available(self.players_by_initials.get((position, words[0].upper()), []))
+            if candidates != []:
+                return candidates
+
+        return self.find_by_name(" ".join(words), position)
+
+
+    def find_by_name(self, name: str, position: str | None = None) -> list[Player]:
+        query: str = normalize_name(name)
+        if query == "":
+            return []
+
+        ranks: set[int] = set()
+        suffix_index: int = bisect_left(self.name_suffixes, (query,))
+        while suffix_index < len(self.name_suffixes) and self.name_suffixes[suffix_index][0].startswith(query):
+            ranks.add(self.name_suffixes[suffix_index][1])
+            suffix_index += 1
+
+        return self.available([self.available_players.ranked_players[rank] for rank in sorted(ranks)], position)
+
+
+    def find_close(self, given_input: str) -> list[Player]:
+        # for when find comes up empty and the name was probably misspelled. it scans the pool, and its guesses
+        # should be confirmed rather than taken
+        position, words = self.split_position(given_input)
+        query: str = normalize_name(" ".join(words))
+        if query == "":
+            return []
+
+        import difflib
+        available_names: list[str] = [player_name for player_name, players in self.players_by_name.items()
+                                      if self.available(players, position) != []]
+        close_names: list[str] = difflib.get_close_matches(query, available_names, NUM_FUZZY_MATCHES,
+                                                           FUZZY_MATCH_CUTOFF)
+
+        return sorted((player for close_name in close_names
+                       for player in self.available(self.players_by_name[close_name], position)),
+                      key=lambda x: self.available_players.rank_by_player[x])
+
+
+    def split_position(self, given_input: str) -> tuple[str | None, list[str]]:
+        words: list[str] = given_input.split()
+        if words == []:
+            return None, []
+
+        position: str = POSITION_ENTRY_ALIASES.get(words[0].upper(), words[0].upper())
+        if position in self.positions:
+            return position, words[1:]
+
+        return None, words
+
+
+    def available(self, players: list[Player], position: str | None = None) -> list[Player]:
+        return [player for player in players if player in self.available_players
+                and (position is None or player.position == position)]
+
+
+def player_initials(name: str) -> set[str]:
+    # the first two letters of every name, as typed while drafting. punctuation is kept in one version and dropped
+    # in another so "D'Andre Swift" is D'SW or DASW, and suffixes can be left off so "Marvin Harrison Jr." is MAHA
+    raw_words: list[str] = name.split(" ")
+    normalized_words: list[str] = normalize_name(name).split()
+
+    initials: set[str] = {"".join(word[0:2] for word in raw_words).upper(),
+                          "".join(word[0:2] for word in normalized_words).upper()}
+    if len(normalized_words) > 2:
+        initials.add((normalized_words[0][0:2] + normalized_words[1][0:2]).upper())
+
+    return initials
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9/ ]", "", name.lower().replace("-", " ")).split())
@@ -1,28 +1,83 @@
 from pathlib import Path
+from typing import Iterable, Iterator
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import zipfile
+
+CSV_HEADER: str = "name,position,expected gamely score\n"
+# what a missing, half-written or out of date compiled pool can raise while it's read
+COMPILED_POOL_ERRORS: tuple[type[Exception], ...] = (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile)
+# espn titles each player's writeup with the season, e.g. "2025 outlook:"
+OUTLOOK_HEADER: re.Pattern = re.compile(r"\d{4} outlook:")
+# how much a player's score swings from week to week around their true average, and how far a preseason
+# projection of that average is usually off, both as a fraction of the projection
+WEEKLY_SCORE_VARIATION: dict[str, float] = {"QB": .4, "RB": .55, "WR": .6, "TE": .65, "AR": .75, "SK": .45}
+PROJECTION_ERROR: dict[str, float] = {"QB": .2, "RB": .3, "WR": .25, "TE": .3, "AR": .3, "SK": .15}
+DEFAULT_WEEKLY_SCORE_VARIATION: float = .6
+DEFAULT_PROJECTION_ERROR: float = .25
+
 
 class Player:
-    def __init__(self, name: str, position: str, expected_gamely_score: float):
+    __slots__ = ("name", "position", "expected_gamely_score", "player_id", "projection_variance",
+                 "source_projections")
+
+    def __init__(self, name: str, position: str, expected_gamely_score: float, player_id: int = -1,
+                 projection_variance: float = 0, source_projections: dict[str, float] | None = None):
         self.name: str = name
         self.position: str = position
+        # the consensus when the player was merged from several sources, see projections.py
         self.expected_gamely_score: float = expected_gamely_score
+        self.player_id: int = player_id
+        self.projection_variance: float = projection_variance
+        self.source_projections: dict[str, float] = source_projections if source_projections is not None else {}
 
     def __str__(self) -> str:
         return f"{self.position} {self.name} with expected score {self.expected_gamely_score:.4}"
+
+
+    def weekly_score_variance(self) -> float:
+        variation: float = WEEKLY_SCORE_VARIATION.get(self.position, DEFAULT_WEEKLY_SCORE_VARIATION)
+        return (variation * self.expected_gamely_score) ** 2
+
+
+    def average_score_variance(self) -> float:
+        # the usual projection miss, plus however much the sources it was merged from disagree
+        error: float = PROJECTION_ERROR.get(self.position, DEFAULT_PROJECTION_ERROR)
+        return (error * self.expected_gamely_score) ** 2 + self.projection_variance
+
+
+# the parsed pool for this process, keyed on the csv's mtime. forked workers inherit it instead of re-parsing
+_loaded_player_pool: tuple[int, list[Player]] | None = None
+_player_pool_lock: threading.Lock = threading.Lock()
     
 
-def get_player_raw_data() -> list[str]:
-    base_directory: Path = Path(__file__).parent
-    raw_data_path: Path = base_directory / "player_data_raw.txt"
+def iter_player_raw_data(raw_data_path: Path) -> Iterator[Player]:
+    # one pass over the dump, holding only the current player's lines. every player's block starts with a "rank"
+    # line and their projected season total is the line right before "<season> outlook:"
+    with open(raw_data_path, encoding="utf-8") as reader:
+        player_info_lines: list[str] | None = None
 
-    return open(raw_data_path, encoding="utf-8").read().lower().split("\n")
+        for line in reader:
+            line = line.rstrip("\r\n").lower()
 
+            if line == "rank":
+                player_info_lines = [line]
+            elif player_info_lines is not None and OUTLOOK_HEADER.fullmatch(line):
+                yield construct_player(player_info_lines)
+                player_info_lines = None
+            elif player_info_lines is not None:
+                player_info_lines.append(line)
 
-def construct_player(player_info_lines: list[str], root_player_index: int) -> Player:
-    player_name = player_info_lines[root_player_index + 4].title()
-    player_position = player_info_lines[root_player_index + 5][-2:].upper()
 
-    expected_points_index = player_info_lines.index("2025 outlook:", root_player_index) - 1
-    total_expected_points = float(player_info_lines[expected_points_index])
+def construct_player(player_info_lines: list[str]) -> Player:
+    player_name = player_info_lines[4].title()
+    player_position = player_info_lines[5][-2:].upper()
+
+    total_expected_points = float(player_info_lines[-1])
     expected_gamely_score = total_expected_points / 17
 
     return Player(player_name, player_position, expected_gamely_score)
@@ -43,35 +98,149 @@ def read_player_csv() -> list[Player]:
     return sorted(players, key=lambda x: -x.expected_gamely_score)
 
 
-def get_player_list() -> list[Player]:
-    CSV_CURRENT: bool = True
+def read_player_pool() -> list[Player]:
+    global _loaded_player_pool
 
-    if CSV_CURRENT:
-        return read_player_csv()
-    
-    players: list[Player] = []
+    base_directory: Path = Path(__file__).parent
+    csv_path: Path = base_directory / "player_data.csv"
+    source_mtime: int = csv_path.stat().st_mtime_ns
 
-    player_info_lines: list[str] = get_player_raw_data()
+    # a background preload may already be reading the pool, in which case wait for it rather than read it twice
+    with _player_pool_lock:
+        if _loaded_player_pool is None or _loaded_player_pool[0] != source_mtime:
+            _loaded_player_pool = (source_mtime, assign_player_ids(load_compiled_player_pool(csv_path, source_mtime)))
 
-    last_player_index = 0
-    while "rank" in player_info_lines[last_player_index:]:
-        root_player_index = player_info_lines.index("rank", last_player_index)
-        players.append(construct_player(player_info_lines, root_player_index))
+    # players are never modified, so drafts can share them and only need their own list
+    return _loaded_player_pool[1][:]
 
-        last_player_index = root_player_index + 1
 
-    players.sort(key=lambda x: -x.expected_gamely_score)
+def load_compiled_player_pool(csv_path: Path, source_mtime: int) -> list[Player]:
+    import numpy as np
+
+    compiled_path: Path = csv_path.with_suffix(".npz")
+
+    compiled_mtime: int | None = None
+    try:
+        with np.load(compiled_path) as compiled_pool:
+            compiled_hash: str = str(compiled_pool["source_hash"])
+            players: list[Player] = [Player(str(name), str(position), float(score)) for name, position, score\
+                    in zip(compiled_pool["names"], compiled_pool["positions"], compiled_pool["scores"], strict=True)]
+            compiled_mtime = int(compiled_pool["source_mtime"])
+    except COMPILED_POOL_ERRORS:
+        # anything wrong with the compiled pool just means parsing the csv again
+        pass
+
+    if compiled_mtime is not None:
+        if compiled_mtime == source_mtime:
+            return players
+
+        if compiled_hash == file_hash(csv_path):
+            # same contents with a new mtime (i.e. a fresh checkout), so skip hashing next time
+            compile_player_pool(players, compiled_path, source_mtime, compiled_hash)
+            return players
+
+    players = read_player_csv()
+    compile_player_pool(players, compiled_path, source_mtime, file_hash(csv_path))
+    return players
+
+
+def compile_player_pool(players: list[Player], compiled_path: Path, source_mtime: int, source_hash: str) -> None:
+    import numpy as np
+
+    # written next to the real one and renamed over it, so a process reading the pool never sees half of it
+    try:
+        with tempfile.NamedTemporaryFile("wb", dir=compiled_path.parent, prefix=compiled_path.stem,
+                                         suffix=".tmp", delete=False) as writer:
+            temporary_path: Path = Path(writer.name)
+            np.savez(writer, names=np.array([player.name for player in players]),
+                     positions=np.array([player.position for player in players]),
+                     scores=np.array([player.expected_gamely_score for player in players], dtype=np.float64),
+                     source_mtime=np.int64(source_mtime), source_hash=np.array(source_hash))
+    except OSError:
+        # a read-only checkout still works, it just parses the csv every time
+        return
+
+    try:
+        os.replace(temporary_path, compiled_path)
+    except OSError:
+        temporary_path.unlink(missing_ok=True)
+
+
+def assign_player_ids(players: list[Player]) -> list[Player]:
+    # ids are positions in the ranked pool, so they can index arrays of per-player values
+    for player_id, player in enumerate(players):
+        player.player_id = player_id
 
-    construct_player_csv(players)
     return players
 
 
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def get_player_list() -> list[Player]:
+    CSV_CURRENT: bool = True
+
+    if CSV_CURRENT:
+        return read_player_pool()
+    
+    base_directory: Path = Path(__file__).parent
+    players: list[Player] = sorted(iter_player_raw_data(base_directory / "player_data_raw.txt"),
+                                   key=lambda x: -x.expected_gamely_score)
+
+    construct_player_csv(players)
+    return assign_player_ids(players)
+
+
 def construct_player_csv(players: list[Player]) -> None:
     base_directory: Path = Path(__file__).parent
     csv_path: Path = base_directory / "player_data.csv"
 
     with open(csv_path, "w", encoding="utf-8") as writer:
-        writer.write("name,position,expected gamely score\n")
+        writer.write(CSV_HEADER)
         for player in players:
-            writer.write(f"{player.name},{player.position},{player.expected_gamely_score:.4}\n")
+            writer.write(player_csv_row(player) + "\n")
+
+
+def update_player_csv(players: Iterable[Player]) -> None:
+    # adds players the csv doesn't have yet by appending to it, and only rewrites it if a known player's projection
+    # changed. the rows don't need to stay sorted since they're sorted when read
+    base_directory: Path = Path(__file__).parent
+    csv_path: Path = base_directory / "player_data.csv"
 
+    known_rows: dict[tuple[str, str], str] = {}
+    with open(csv_path, "r", encoding="utf-8") as reader:
+        next(reader)
+        for line in reader:
+            player_info: list[str] = line.rstrip("\n").split(",")
+            known_rows[(player_info[0], player_info[1])] = line.rstrip("\n")
+
+    new_rows: list[str] = []
+    changed: bool = False
+    for player in players:
+        row: str = player_csv_row(player)
+        key: tuple[str, str] = (player.name, player.position)
+
+        if key not in known_rows:
+            new_rows.append(row)
+        elif known_rows[key] != row:
+            changed = True
+        known_rows[key] = row
+
+    if changed:
+        with open(csv_path, "w", encoding="utf-8") as writer:
+            writer.write(CSV_HEADER)
+            writer.writelines(row + "\n" for row in known_rows.values())
+    elif new_rows != []:
+        with open(csv_path, "a", encoding="utf-8") as writer:
+            writer.writelines(row + "\n" for row in new_rows)
+
+
+def player_csv_row(player: Player) -> str:
+    return f"{player.name},{player.position},{player.expected_gamely_score:.4}"
+
+
+if __name__ == "__main__":
+    # merge one or more extra dump pages into the csv, e.g. python players.py page_9.txt page_10.txt
+    for raw_data_path in sys.argv[1:]:
+        update_player_csv(iter_player_raw_data(Path(raw_data_path)))
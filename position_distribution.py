@@ -0,0 +1,91 @@
+from strategy_utils import *
+from instrumentation import INSTRUMENTATION
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    from draft import Draft
+
+
+def drafter_pick_probabilities(drafter: DraftedTeam, positions: list[str]) -> np.ndarray:
+    # column 0 is the chance the drafter's next pick is each position, column i + 1 the chance their following
+    # pick is each position and their next pick was positions[i]
+    position_counts: tuple[int, ...] = drafter.position_counts()
+    likelihood_each_position_taken: dict[str, float] = likelihood_for_position_counts(drafter.league, position_counts)
+    pick_probabilities: np.ndarray = np.zeros((len(positions), len(positions) + 1))
+    pick_probabilities[:, 0] = [likelihood_each_position_taken[position] for position in positions]
+
+    for first_pick_index, first_pick_position in enumerate(positions):
+        first_pick_likelihood: float = likelihood_each_position_taken[first_pick_position]
+        if first_pick_likelihood == 0:
+            continue
+
+        second_likelihood_each_position_taken: dict[str, float] = likelihood_for_position_counts(
+                drafter.league, position_counts_after_pick(drafter.league, position_counts, first_pick_position))
+
+        pick_probabilities[:, first_pick_index + 1] = [second_likelihood_each_position_taken[position]\
+                * first_pick_likelihood for position in positions]
+
+    return pick_probabilities
+
+
+def drafter_transition_kernel(drafter: DraftedTeam, positions: list[str]) -> np.ndarray:
+    # row p is the distribution of how many times the drafter takes positions[p], as the product of one
+    # bernoulli factor per column of drafter_pick_probabilities
+    pick_probabilities: np.ndarray = drafter_pick_probabilities(drafter, positions)
+    kernel: np.ndarray = np.zeros((len(positions), pick_probabilities.shape[1] + 1))
+    kernel[:, 0] = 1
+
+    for probability in pick_probabilities.T:
+        kernel[:, 1:] = kernel[:, 1:] * (1 - probability[:, None]) + kernel[:, :-1] * probability[:, None]
+        kernel[:, 0] *= 1 - probability
+
+    return kernel
+
+
+def convolve_distribution(distribution: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    convolved: np.ndarray = np.zeros((distribution.shape[0], distribution.shape[1] + kernel.shape[1] - 1))
+
+    for times_taken in range(kernel.shape[1]):
+        convolved[:, times_taken:times_taken + distribution.shape[1]] += distribution * kernel[:, times_taken, None]
+
+    return convolved
+
+
+def position_distribution_array(drafters_between: list[DraftedTeam], positions: list[str],
+                                distribution: np.ndarray | None = None) -> np.ndarray:
+    if distribution is None:
+        distribution = np.zeros((len(positions), 1))
+        distribution[:, 0] = 1
+
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.count("distribution_updates", len(drafters_between))
+
+    for drafter in drafters_between:
+        distribution = convolve_distribution(distribution, drafter_transition_kernel(drafter, positions))
+
+    return distribution
+
+
+def get_expected_loss_by_position(draft: "Draft", distribution: np.ndarray, positions: list[str]) -> dict[str, float]:
+    expected_loss: dict[str, float] = {}
+
+    for position_index, position in enumerate(positions):
+        # a deep enough draft can run a position dry, and there's nothing left there to lose
+        if draft.available_by_position[position].num_available == 0:
+            continue
+
+        expected_loss[position] = draft.best_at_position(position).expected_gamely_score\
+                - get_expected_next_score(draft, distribution[position_index], position)
+
+    return expected_loss
+
+
+def get_expected_next_score(draft: "Draft", times_taken_distribution: np.ndarray, position: str) -> float:
+    # the expected score of the best player left at the position once the picks the distribution covers are made.
+    # once more players could be taken than are left, the last one left is what we'd end up with
+    scores: list[float] = [player.expected_gamely_score for player\
+                           in draft.available_by_position[position].top(len(times_taken_distribution))]
+    scores += [scores[-1]] * (len(times_taken_distribution) - len(scores))
+
+    return float(np.dot(times_taken_distribution, scores))
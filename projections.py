@@ -0,0 +1,239 @@
+from players import Player, assign_player_ids, construct_player_csv, file_hash, iter_player_raw_data
+from pathlib import Path
+from statistics import mean, pvariance
+import argparse
+import csv
+import hashlib
+import json
+import re
+
+PROJECTION_SUFFIXES: tuple[str, ...] = (".csv", ".json", ".txt")
+PROJECTION_CACHE_NAME: str = ".projection_cache.json"
+# bump when the cached rows or merged players change shape, so old caches are rebuilt instead of misread
+PROJECTION_CACHE_VERSION: int = 1
+GAMES_PER_SEASON: int = 17
+
+# providers name the same positions differently, these map them onto the ones the draft uses
+POSITION_ALIASES: dict[str, str] = {"D/ST": "AR", "DST": "AR", "DEF": "AR", "D": "AR", "K": "SK", "PK": "SK"}
+NAME_SUFFIXES: frozenset[str] = frozenset(("jr", "sr", "ii", "iii", "iv", "v"))
+DEFENSE_NAME_WORDS: frozenset[str] = frozenset(("d/st", "dst", "def", "defense", "d"))
+# column names providers use for a per game projection and for a season total
+GAMELY_SCORE_COLUMNS: tuple[str, ...] = ("expected gamely score", "points per game", "ppg", "fpts/g")
+SEASON_SCORE_COLUMNS: tuple[str, ...] = ("projected points", "season points", "points", "fpts", "proj")
+
+
+class SourceProjections:
+    __slots__ = ("source_mtime", "source_hash", "rows")
+
+    def __init__(self, source_mtime: int, source_hash: str, rows: dict[str, tuple[str, str, float]]):
+        self.source_mtime: int = source_mtime
+        self.source_hash: str = source_hash
+        # merge key -> (name, position, expected gamely score) as the source wrote them
+        self.rows: dict[str, tuple[str, str, float]] = rows
+
+
+class ProjectionIndex:
+    # every source's parsed rows plus the merged pool, kept on disk so repeat ingests only parse the sources that
+    # changed and skip the merge entirely when none did
+    def __init__(self, cache_path: Path):
+        self.cache_path: Path = cache_path
+        self.sources: dict[str, SourceProjections] = {}
+        self.merged_fingerprint: list[list[str]] = []
+        self.merged_players: list[Player] = []
+        self.num_parsed_sources: int = 0
+
+        self._read_cache()
+
+
+    def ingest(self, source_paths: list[Path]) -> list[Player]:
+        self.num_parsed_sources = 0
+        sources: dict[str, SourceProjections] = {}
+
+        for source_path in sorted(source_paths):
+            source_name: str = source_path.name
+            if source_name in sources:
+                raise ValueError(f"two projection sources are named {source_name}")
+
+            sources[source_name] = self._load_source(source_name, source_path)
+
+        self.sources = sources
+        fingerprint: list[list[str]] = [[source_name, source.source_hash] for source_name, source in sources.items()]
+
+        if fingerprint != self.merged_fingerprint:
+            self.merged_players = merge_projections(sources)
+            self.merged_fingerprint = fingerprint
+            self._write_cache()
+        elif self.num_parsed_sources > 0:
+            # contents unchanged but the mtimes moved, so save them to skip hashing next time
+            self._write_cache()
+
+        return assign_player_ids(self.merged_players[:])
+
+
+    def _load_source(self, source_name: str, source_path: Path) -> SourceProjections:
+        source_mtime: int = source_path.stat().st_mtime_ns
+        cached_source: SourceProjections | None = self.sources.get(source_name)
+
+        if cached_source is not None and cached_source.source_mtime == source_mtime:
+            return cached_source
+
+        source_hash: str = file_hash(source_path)
+        self.num_parsed_sources += 1
+
+        if cached_source is not None and cached_source.source_hash == source_hash:
+            return SourceProjections(source_mtime, source_hash, cached_source.rows)
+
+        rows: dict[str, tuple[str, str, float]] = {}
+        for name, position, expected_gamely_score in read_projection_source(source_path):
+            position = normalize_position(position)
+            rows[merge_key(name, position)] = (name, position, expected_gamely_score)
+
+        return SourceProjections(source_mtime, source_hash, rows)
+
+
+    def _read_cache(self) -> None:
+        if not self.cache_path.exists():
+            return
+
+        cache: dict = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        if cache.get("version") != PROJECTION_CACHE_VERSION:
+            return
+
+        for source_name, source in cache["sources"].items():
+            self.sources[source_name] = SourceProjections(source["mtime"], source["hash"],
+                    {key: (name, position, score) for key, (name, position, score) in source["rows"].items()})
+
+        self.merged_fingerprint = cache["merged_fingerprint"]
+        self.merged_players = [Player(name, position, score, projection_variance=variance,
+                                      source_projections=source_projections)
+                               for name, position, score, variance, source_projections in cache["merged_players"]]
+
+
+    def _write_cache(self) -> None:
+        cache: dict = {"version": PROJECTION_CACHE_VERSION,
+                       "sources": {source_name: {"mtime": source.source_mtime, "hash": source.source_hash,
+                                                 "rows": source.rows} for source_name, source in self.sources.items()},
+                       "merged_fingerprint": self.merged_fingerprint,
+                       "merged_players": [[player.name, player.position, player.expected_gamely_score,
+                                           player.projection_variance, player.source_projections]
+                                          for player in self.merged_players]}
+
+        try:
+            self.cache_path.write_text(json.dumps(cache), encoding="utf-8")
+        except OSError:
+            # same as the compiled pool, a read-only directory just means parsing every source every time
+            pass
+
+
+def merge_projections(sources: dict[str, SourceProjections]) -> list[Player]:
+    # the first source (by name) to list a player decides how their name is shown
+    merged_rows: dict[str, tuple[str, str, dict[str, float]]] = {}
+
+    for source_name, source in sources.items():
+        for key, (name, position, expected_gamely_score) in source.rows.items():
+            if key not in merged_rows:
+                merged_rows[key] = (name, position, {})
+            merged_rows[key][2][source_name] = expected_gamely_score
+
+    players: list[Player] = []
+    for name, position, source_projections in merged_rows.values():
+        scores: list[float] = list(source_projections.values())
+        players.append(Player(name, position, mean(scores), projection_variance=pvariance(scores),
+                              source_projections=source_projections))
+
+    return sorted(players, key=lambda x: -x.expected_gamely_score)
+
+
+def merge_key(name: str, position: str) -> str:
+    normalized: str = f"{normalize_name(name, position)}|{position}"
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def normalize_name(name: str, position: str) -> str:
+    words: list[str] = re.sub(r"[.'`’]", "", name.lower()).replace("-", " ").split()
+
+    if position == "AR":
+        # defenses go by "Steelers D/St" or "Pittsburgh Steelers" depending on the provider, the team nickname is
+        # the part they share
+        words = [word for word in words if word not in DEFENSE_NAME_WORDS]
+        return words[-1] if words != [] else ""
+
+    while len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+
+    return " ".join(words)
+
+
+def normalize_position(position: str) -> str:
+    position = position.strip().upper()
+    return POSITION_ALIASES.get(position, position)
+
+
+def read_projection_source(source_path: Path) -> list[tuple[str, str, float]]:
+    if source_path.suffix == ".txt":
+        # an espn dump like player_data_raw.txt
+        return [(player.name, player.position, player.expected_gamely_score)
+                for player in iter_player_raw_data(source_path)]
+
+    if source_path.suffix == ".json":
+        records: list[dict] = json.loads(source_path.read_text(encoding="utf-8"))
+    elif source_path.suffix == ".csv":
+        with open(source_path, newline="", encoding="utf-8") as reader:
+            records = list(csv.DictReader(reader))
+    else:
+        raise ValueError(f"can't read projections from {source_path}, expected one of {PROJECTION_SUFFIXES}")
+
+    return [projection_from_record(record, source_path) for record in records]
+
+
+def projection_from_record(record: dict, source_path: Path) -> tuple[str, str, float]:
+    fields: dict[str, object] = {str(field).strip().lower(): value for field, value in record.items()}
+
+    for column in GAMELY_SCORE_COLUMNS:
+        if fields.get(column) not in (None, ""):
+            return str(fields["name"]), str(fields["position"]), float(fields[column])
+
+    for column in SEASON_SCORE_COLUMNS:
+        if fields.get(column) not in (None, ""):
+            return str(fields["name"]), str(fields["position"]), float(fields[column]) / GAMES_PER_SEASON
+
+    raise ValueError(f"{source_path} has a row without a projection: {record}")
+
+
+def find_projection_sources(paths: list[Path]) -> list[Path]:
+    source_paths: list[Path] = []
+
+    for path in paths:
+        if path.is_dir():
+            source_paths.extend(source_path for source_path in path.iterdir()
+                                if source_path.suffix in PROJECTION_SUFFIXES and not source_path.name.startswith("."))
+        else:
+            source_paths.append(path)
+
+    return source_paths
+
+
+def load_projection_pool(paths: list[Path], cache_path: Path | None = None) -> list[Player]:
+    # a pool with consensus projections, ready to pass as the players of a Draft or AutoDraft
+    if cache_path is None:
+        cache_path = Path(__file__).parent / PROJECTION_CACHE_NAME
+
+    return ProjectionIndex(cache_path).ingest(find_projection_sources(paths))
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="merge projection files from several "
+                                                              "providers into one consensus pool")
+    parser.add_argument("sources", nargs="+", type=Path, help="projection files, or directories of them")
+    parser.add_argument("--write-csv", action="store_true", help="make the consensus the pool drafts use by default")
+    arguments: argparse.Namespace = parser.parse_args()
+
+    players: list[Player] = load_projection_pool(arguments.sources)
+
+    for player in players:
+        source_scores: str = ", ".join(f"{source_name} {score:.4}"
+                                       for source_name, score in player.source_projections.items())
+        print(f"{player} (variance {player.projection_variance:.4}; {source_scores})")
+
+    if arguments.write_csv:
+        construct_player_csv(players)
@@ -0,0 +1,59 @@
+from functools import lru_cache
+import math
+
+# picks_until_next is at most twice the number of other drafters, so this covers leagues of up to 33 teams
+QUANTILE_TABLE_MAX_TRIALS: int = 64
+
+
+@lru_cache(maxsize=None)
+def binomial_quantile_table(percentile: float, proportion: float) -> tuple[int, ...]:
+    # index n is the percentile quantile of binomial(n, proportion), built once for every n up to the max
+    quantiles: list[int] = []
+
+    for trials in range(QUANTILE_TABLE_MAX_TRIALS + 1):
+        probability_mass: list[float] = [math.comb(trials, successes) * proportion ** successes\
+                                         * (1 - proportion) ** (trials - successes) for successes in range(trials + 1)]
+        quantiles.append(distribution_quantile(percentile, probability_mass))
+
+    return tuple(quantiles)
+
+
+def binomial_quantile(percentile: float, trials: int, proportion: float) -> int:
+    if 0 <= trials <= QUANTILE_TABLE_MAX_TRIALS:
+        return binomial_quantile_table(percentile, proportion)[trials]
+
+    # only leagues bigger than the table covers ever need scipy, so only they pay to import it
+    from scipy.stats import binom
+    return int(binom.ppf(percentile, trials, proportion))
+
+
+@lru_cache(maxsize=4096)
+def poisson_binomial_distribution(probabilities: tuple[float, ...]) -> tuple[float, ...]:
+    # how many of the independent trials succeed when each has its own chance, e.g. each drafter before our next pick
+    probability_mass: list[float] = [1]
+
+    for probability in probabilities:
+        padded_mass: list[float] = [0] + probability_mass + [0]
+        probability_mass = [padded_mass[successes + 1] * (1 - probability) + padded_mass[successes] * probability
+                            for successes in range(len(probability_mass) + 1)]
+
+    return tuple(probability_mass)
+
+
+def poisson_binomial_quantile(percentile: float, probabilities: tuple[float, ...]) -> int:
+    return distribution_quantile(percentile, poisson_binomial_distribution(probabilities))
+
+
+def poisson_binomial_expected_count(probabilities: tuple[float, ...]) -> float:
+    return sum(probabilities)
+
+
+def distribution_quantile(percentile: float, probability_mass: list[float] | tuple[float, ...]) -> int:
+    cumulative_probability: float = 0
+
+    for successes, probability in enumerate(probability_mass):
+        cumulative_probability += probability
+        if cumulative_probability >= percentile:
+            return successes
+
+    return len(probability_mass) - 1
@@ -0,0 +1,139 @@
+from strategy_common import *
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import TYPE_CHECKING
+import contextlib
+import io
+import math
+import os
+import time
+import numpy as np
+
+if TYPE_CHECKING:
+    from draft import Draft
+
+ROLLOUT_TIME_BUDGET: float = 2
+# leaves room inside the budget for sending the draft to the workers and merging what comes back
+ROLLOUT_DEADLINE_SHARE: float = .85
+ROLLOUT_WORKERS: int = os.cpu_count() or 1
+UCB_EXPLORATION: float = 2
+
+_rollout_executor: ProcessPoolExecutor | None = None
+
+
+class RolloutStatistics:
+    def __init__(self, num_candidates: int):
+        self.score_totals: list[float] = [0] * num_candidates
+        self.rollout_counts: list[int] = [0] * num_candidates
+
+
+    def add(self, candidate_index: int, score: float) -> None:
+        self.score_totals[candidate_index] += score
+        self.rollout_counts[candidate_index] += 1
+
+
+    def merge(self, other: "RolloutStatistics") -> None:
+        for candidate_index in range(len(self.score_totals)):
+            self.score_totals[candidate_index] += other.score_totals[candidate_index]
+            self.rollout_counts[candidate_index] += other.rollout_counts[candidate_index]
+
+
+    def total_rollouts(self) -> int:
+        return sum(self.rollout_counts)
+
+
+    def mean_score(self, candidate_index: int) -> float:
+        if self.rollout_counts[candidate_index] == 0:
+            return -math.inf
+
+        return self.score_totals[candidate_index] / self.rollout_counts[candidate_index]
+
+
+    def best_candidate_index(self) -> int:
+        return max(range(len(self.score_totals)), key=self.mean_score)
+
+
+    def next_candidate_index(self) -> int:
+        for candidate_index, rollout_count in enumerate(self.rollout_counts):
+            if rollout_count == 0:
+                return candidate_index
+
+        log_total: float = math.log(self.total_rollouts())
+        return max(range(len(self.score_totals)), key=lambda candidate_index: self.mean_score(candidate_index)\
+                + UCB_EXPLORATION * math.sqrt(log_total / self.rollout_counts[candidate_index]))
+
+
+def rollout(draft: "Draft", candidate: Player, rollout_policies: list[DraftStrategy],
+            deadline: float = math.inf) -> float | None:
+    # None if the deadline passes partway through, since a worker still busy with it would hold up the next pick
+    drafter: DraftedTeam = draft.current_drafter()
+
+    with draft.lookahead():
+        draft.make_pick(candidate)
+
+        while not draft._draft_completed():
+            if time.time() >= deadline:
+                return None
+
+            draft.make_pick(rollout_policies[draft.current_drafter_index].strategy(draft))
+
+        return drafter.expected_gamely_score()
+
+
+def run_rollouts(draft: "Draft", candidates: list[Player], rollout_policies: list[DraftStrategy],
+                 deadline: float) -> RolloutStatistics:
+    rollout_statistics: RolloutStatistics = RolloutStatistics(len(candidates))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.time() < deadline:
+            candidate_index: int = rollout_statistics.next_candidate_index()
+            score: float | None = rollout(draft, candidates[candidate_index], rollout_policies, deadline)
+
+            if score is not None:
+                rollout_statistics.add(candidate_index, score)
+
+    return rollout_statistics
+
+
+def _run_rollouts_in_worker(draft: "Draft", candidates: list[Player], rollout_policies: list[DraftStrategy],
+                            deadline: float, seed: int) -> RolloutStatistics:
+    # every worker gets the same copy of the draft, so each needs its own stream for the rollouts to differ
+    draft.rng = np.random.default_rng(seed)
+    return run_rollouts(draft, candidates, rollout_policies, deadline)
+
+
+def get_rollout_executor() -> ProcessPoolExecutor:
+    global _rollout_executor
+
+    if _rollout_executor is None:
+        _rollout_executor = ProcessPoolExecutor(max_workers=ROLLOUT_WORKERS)
+
+    return _rollout_executor
+
+
+def search_candidates(draft: "Draft", candidates: list[Player], rollout_policies: list[DraftStrategy],
+                      time_budget: float | None = None) -> Player:
+    if time_budget is None:
+        time_budget = ROLLOUT_TIME_BUDGET
+
+    start_time: float = time.time()
+    deadline: float = start_time + time_budget * ROLLOUT_DEADLINE_SHARE
+
+    if ROLLOUT_WORKERS <= 1:
+        rollout_statistics: RolloutStatistics = run_rollouts(draft, candidates, rollout_policies, deadline)
+
+    else:
+        rollout_statistics = RolloutStatistics(len(candidates))
+        seeds: np.ndarray = draft.rng.integers(0, 2**63, ROLLOUT_WORKERS)
+        futures = [get_rollout_executor().submit(_run_rollouts_in_worker, draft, candidates, rollout_policies,
+                                                 deadline, int(seed)) for seed in seeds]
+
+        for future in futures:
+            try:
+                rollout_statistics.merge(future.result(timeout=max(start_time + time_budget - time.time(), 0)))
+            except TimeoutError:
+                future.cancel()
+
+    if rollout_statistics.total_rollouts() == 0:
+        return candidates[0]
+
+    return candidates[rollout_statistics.best_candidate_index()]
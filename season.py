@@ -0,0 +1,113 @@
+from players import Player
+from strategy_common import DraftedTeam
+import argparse
+import time
+import numpy as np
+
+# a fantasy regular season, before the playoffs
+SEASON_WEEKS: int = 14
+NUM_SEASON_SAMPLES: int = 10000
+
+
+class SeasonOutlook:
+    def __init__(self, teams: list[DraftedTeam], championship_probabilities: np.ndarray, head_to_head: np.ndarray,
+                 num_samples: int):
+        self.teams: list[DraftedTeam] = teams
+        # the chance each team scores the most over the season
+        self.championship_probabilities: np.ndarray = championship_probabilities
+        # head_to_head[i, j] is the chance team i outscores team j in a given week
+        self.head_to_head: np.ndarray = head_to_head
+        self.weekly_win_rates: np.ndarray = head_to_head.sum(axis=1) / max(len(teams) - 1, 1)
+        self.num_samples: int = num_samples
+
+
+    def ranked_team_indexes(self) -> list[int]:
+        return sorted(range(len(self.teams)), key=lambda x: -self.championship_probabilities[x])
+
+
+    def print_head_to_head(self) -> None:
+        names: list[str] = [team.drafter_name[:8] for team in self.teams]
+        print(" " * 9 + " ".join(f"{name:>8}" for name in names))
+
+        for team_index, name in enumerate(names):
+            print(f"{name:>8} " + " ".join(" " * 8 if opponent_index == team_index else f"{probability:>8.1%}"
+                                           for opponent_index, probability in enumerate(self.head_to_head[team_index])))
+
+
+def simulate_seasons(teams: list[DraftedTeam], num_samples: int = NUM_SEASON_SAMPLES,
+                     rng: np.random.Generator | None = None, num_weeks: int = SEASON_WEEKS) -> SeasonOutlook:
+    # every team's best lineup starts every week. each sample first draws every starter's true average around their
+    # projection, then each week's score around that, all as one array per draw. the season totals and the head to
+    # head odds both come from those same weekly scores
+    if rng is None:
+        rng = np.random.default_rng()
+
+    starters: list[Player] = []
+    starter_teams: list[int] = []
+    for team_index, team in enumerate(teams):
+        for slot_starters in team.lineup().starters.values():
+            starters.extend(slot_starters)
+            starter_teams.extend([team_index] * len(slot_starters))
+
+    projections: np.ndarray = np.array([player.expected_gamely_score for player in starters])
+    average_deviations: np.ndarray = np.sqrt([player.average_score_variance() for player in starters])
+    weekly_deviations: np.ndarray = np.sqrt([player.weekly_score_variance() for player in starters])
+
+    # summing starters into their teams is one matrix product per draw
+    team_membership: np.ndarray = np.zeros((len(starters), len(teams)))
+    team_membership[np.arange(len(starters)), starter_teams] = 1
+
+    true_averages: np.ndarray = np.maximum(projections + rng.standard_normal((num_samples, len(starters)))\
+            * average_deviations, 0)
+
+    season_totals: np.ndarray = np.zeros((num_samples, len(teams)))
+    weekly_wins: np.ndarray = np.zeros((len(teams), len(teams)))
+    for _ in range(num_weeks):
+        # nobody scores below zero in a week
+        week_scores: np.ndarray = np.maximum(true_averages + rng.standard_normal((num_samples, len(starters)))\
+                * weekly_deviations, 0)
+        week_totals: np.ndarray = week_scores @ team_membership
+
+        season_totals += week_totals
+        weekly_wins += (week_totals[:, :, None] > week_totals[:, None, :]).sum(axis=0)
+
+    championship_probabilities: np.ndarray = np.bincount(season_totals.argmax(axis=1),
+                                                         minlength=len(teams)) / num_samples
+    head_to_head: np.ndarray = weekly_wins / (num_samples * num_weeks)
+
+    return SeasonOutlook(teams, championship_probabilities, head_to_head, num_samples)
+
+
+if __name__ == "__main__":
+    from draft import AutoDraft
+    from strategy import get_strategy
+    import contextlib
+    import io
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="draft a league with one strategy and "
+                                                              "sample how its seasons play out")
+    parser.add_argument("--strategy", default="predictive")
+    parser.add_argument("--drafters", type=int, default=12)
+    parser.add_argument("--samples", type=int, default=NUM_SEASON_SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    draft: AutoDraft = AutoDraft(get_strategy(arguments.strategy), get_strategy(arguments.strategy),
+                                 arguments.drafters, 0, arguments.seed)
+    draft.print_picks = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        draft.run_draft()
+
+    start_time: float = time.perf_counter()
+    outlook: SeasonOutlook = simulate_seasons(draft.teams, arguments.samples, np.random.default_rng(arguments.seed))
+    elapsed_seconds: float = time.perf_counter() - start_time
+
+    for team_index in outlook.ranked_team_indexes():
+        team: DraftedTeam = draft.teams[team_index]
+        print(f"{team.drafter_name}: expected {team.expected_gamely_score():.5} per week, most points in "
+              f"{outlook.championship_probabilities[team_index]:.1%} of seasons, wins "
+              f"{outlook.weekly_win_rates[team_index]:.1%} of weekly matchups")
+
+    print("\nchance the row team beats the column team in a week:")
+    outlook.print_head_to_head()
+    print(f"\nsampled {arguments.samples} seasons of {len(draft.teams)} teams in {elapsed_seconds:.3f}s")
@@ -0,0 +1,215 @@
+from strategy_common import *
+from strategy_utils import likelihood_for_position_counts
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TYPE_CHECKING
+import heapq
+import threading
+
+if TYPE_CHECKING:
+    from draft import Draft
+
+# how many of an opponent's likeliest picks are followed from each state, and how many of our turns get worked out
+# before giving up on the less likely ones. every state is less likely the deeper it is, so nothing is worked out
+# until our turn is a few picks off, and the states visited after each real pick are capped as well
+SPECULATION_BRANCHES: int = 3
+SPECULATION_STATE_LIMIT: int = 64
+SPECULATION_DEPTH_LIMIT: int = 6
+SPECULATION_EXPANSION_LIMIT: int = 256
+
+
+class RecommendationSpeculator:
+    # works out what a strategy will recommend at a drafter's next turn while the picks before it are still being
+    # typed in. states are keyed on the ranks of every pick made so far, so once a real pick lands, everything
+    # speculated down its branch is kept. a branch it ruled out that took someone else at the same position is
+    # kept too when patch is given, under the key it would have had, and only that position is worked out again
+    def __init__(self, recommend: Callable[["Draft"], object], drafter_index: int,
+                 patch: Callable[["Draft", object, set[str]], object] | None = None):
+        self.recommend: Callable[["Draft"], object] = recommend
+        self.patch: Callable[["Draft", object, set[str]], object] | None = patch
+        self.drafter_index: int = drafter_index
+        self.recommendations: dict[tuple[int, ...], object] = {}
+        # recommendations that need the positions alongside them worked out again before they're right
+        self.stale_recommendations: dict[tuple[int, ...], tuple[object, set[str]]] = {}
+        self.generation: int = 0
+        self.pending_key: tuple[int, ...] | None = None
+        self.pending: Future | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1)
+
+
+    def speculate(self, draft: "Draft") -> None:
+        key: tuple[int, ...] = pick_key(draft)
+
+        with self._lock:
+            self.generation += 1
+            stale_recommendations: dict[tuple[int, ...], tuple[object, set[str]]] = {
+                    state_key: stale_recommendation for state_key, stale_recommendation
+                    in self.stale_recommendations.items() if state_key[:len(key)] == key}
+            if self.patch is not None and key != ():
+                for state_key, stale_recommendation in self._ruled_out(draft, key):
+                    stale_recommendations.setdefault(state_key, stale_recommendation)
+
+            self.recommendations = {state_key: recommendation for state_key, recommendation
+                                    in self.recommendations.items() if state_key[:len(key)] == key}
+            self.stale_recommendations = stale_recommendations
+
+        if draft._draft_completed():
+            self.shutdown()
+            return
+        if picks_until_turn(draft, self.drafter_index) > SPECULATION_DEPTH_LIMIT:
+            return
+
+        self.pending_key = key
+        self.pending = self._executor.submit(self._speculate, draft, key, self.generation)
+
+
+    def recommendation(self, draft: "Draft") -> object:
+        key: tuple[int, ...] = pick_key(draft)
+
+        if key not in self.recommendations and key == self.pending_key and self.pending is not None:
+            # the worker was started on this very state, so it's already working on the answer
+            self.pending.result()
+
+        with self._lock:
+            recommendation: object | None = self.recommendations.get(key)
+            stale_recommendation: tuple[object, set[str]] | None = self.stale_recommendations.get(key)
+
+        if recommendation is None and stale_recommendation is not None:
+            recommendation = self.patch(draft, *stale_recommendation)
+        if recommendation is None:
+            recommendation = self.recommend(draft)
+
+        return recommendation
+
+
+    def _ruled_out(self, draft: "Draft", key: tuple[int, ...])\
+            -> list[tuple[tuple[int, ...], tuple[object, set[str]]]]:
+        # everything kept so far agrees with every pick but the last, which only rules out the branches that took
+        # someone else there. one that took someone at the same position, and never takes who was really picked
+        # later on, reaches a state just like it with only that position's players different
+        ranked_players: list[Player] = draft.available_players.ranked_players
+        position: str = ranked_players[key[-1]].position
+        pick_index: int = len(key) - 1
+        ruled_out: list[tuple[tuple[int, ...], tuple[object, set[str]]]] = []
+
+        for state_key, (recommendation, changed_positions) in [
+                *((state_key, (recommendation, set())) for state_key, recommendation in self.recommendations.items()),
+                *self.stale_recommendations.items()]:
+            if len(state_key) <= pick_index or state_key[pick_index] == key[-1] or key[-1] in state_key:
+                continue
+
+            if ranked_players[state_key[pick_index]].position == position:
+                ruled_out.append((key + state_key[len(key):], (recommendation, changed_positions | {position})))
+
+        return ruled_out
+
+
+    def _speculate(self, real_draft: "Draft", base_key: tuple[int, ...], generation: int) -> None:
+        # the worker gets its own copy, since the real draft keeps changing while it works
+        draft: "Draft" = replicate_draft(real_draft, base_key)
+        base_snapshot: int = draft.snapshot()
+        # best first by how likely the opponents' picks leading to the state are
+        frontier: list[tuple[float, int, list[int]]] = [(-1, 0, [])]
+        num_states_pushed: int = 1
+        num_states_expanded: int = 0
+        num_recommendations: int = 0
+
+        while frontier != [] and num_recommendations < SPECULATION_STATE_LIMIT\
+                and num_states_expanded < SPECULATION_EXPANSION_LIMIT and generation == self.generation:
+            negative_likelihood, _, pick_ranks = heapq.heappop(frontier)
+            num_states_expanded += 1
+            draft.rollback(base_snapshot)
+            draft.replay(pick_ranks)
+
+            if draft._draft_completed():
+                continue
+
+            if draft.current_drafter_index == self.drafter_index:
+                key: tuple[int, ...] = base_key + tuple(pick_ranks)
+                if key not in self.recommendations:
+                    with self._lock:
+                        stale_recommendation: tuple[object, set[str]] | None = self.stale_recommendations.get(key)
+
+                    try:
+                        if stale_recommendation is not None:
+                            recommendation: object = self.patch(draft, *stale_recommendation)
+                        else:
+                            recommendation = self.recommend(draft)
+                    except (IndexError, ValueError):
+                        continue
+
+                    with self._lock:
+                        if generation == self.generation:
+                            self.recommendations[key] = recommendation
+                num_recommendations += 1
+                continue
+
+            for rank, likelihood in likely_picks(draft):
+                heapq.heappush(frontier, (negative_likelihood * likelihood, num_states_pushed, pick_ranks + [rank]))
+                num_states_pushed += 1
+
+
+    def shutdown(self) -> None:
+        self.generation += 1
+        self._executor.shutdown(wait=False)
+
+
+def likely_picks(draft: "Draft") -> list[tuple[int, float]]:
+    # the current drafter's likeliest picks as (rank in pool, likelihood), taking the best player left at each of
+    # the positions they're likeliest to draft
+    drafter: DraftedTeam = draft.current_drafter()
+    likelihood_each_position_taken: dict[str, float] = likelihood_for_position_counts(drafter.league,
+                                                                                      drafter.position_counts())
+    picks: list[tuple[int, float]] = []
+
+    for position, likelihood in sorted(likelihood_each_position_taken.items(), key=lambda x: -x[1]):
+        if len(picks) >= SPECULATION_BRANCHES or likelihood == 0:
+            break
+        if len(draft.available_by_position[position]) == 0:
+            continue
+
+        picks.append((draft.available_players.rank_by_player[draft.best_at_position(position)], likelihood))
+
+    return picks
+
+
+def picks_until_turn(draft: "Draft", drafter_index: int) -> int:
+    # picks made before drafter_index's next turn, following the snake into the next round if need be
+    current_index: int = draft.current_drafter_index
+
+    if draft.snaking_forward():
+        if drafter_index >= current_index:
+            return drafter_index - current_index
+        return 2 * draft.num_drafters - 1 - current_index - drafter_index
+
+    if drafter_index <= current_index:
+        return current_index - drafter_index
+    return current_index + 1 + drafter_index
+
+
+def pick_key(draft: "Draft") -> tuple[int, ...]:
+    rank_by_player: dict[Player, int] = draft.available_players.rank_by_player
+    return tuple(rank_by_player[player] for _, _, player in draft.pick_history)
+
+
+def replicate_draft(draft: "Draft", pick_ranks: tuple[int, ...]) -> "Draft":
+    # only reads what stays the same for the whole draft, so it's safe to call while picks are being made
+    from draft import Draft
+
+    replica: Draft = Draft(True, players=draft.available_players.ranked_players, league=draft.league)
+    replica.print_picks = False
+    replica.num_drafters = draft.num_drafters
+    replica.teams = [DraftedTeam(team.drafter_name, team.strategy, draft.league) for team in draft.teams]
+    replica.replay(list(pick_ranks))
+
+    return replica
+
+
+def speculator_for(draft: "Draft", strategy_name: str, recommend: Callable[["Draft"], object],
+                   patch: Callable[["Draft", object, set[str]], object] | None = None)\
+        -> RecommendationSpeculator | None:
+    for drafter_index, team in enumerate(draft.teams):
+        if team.strategy.name == strategy_name:
+            return RecommendationSpeculator(recommend, drafter_index, patch)
+
+    return None
@@ -1,7 +1,19 @@
 from strategy_common import *
 from strategy_utils import *
-from scipy.stats import binom
-from functools import lru_cache
+from position_distribution import position_distribution_array, get_expected_loss_by_position
+from evaluation import CandidateEvaluation, ManualRecommendation, evaluate_positions, projected_lineup
+from rollout import search_candidates
+from instrumentation import INSTRUMENTATION
+from quantiles import (binomial_quantile, binomial_quantile_table, poisson_binomial_distribution,
+                       poisson_binomial_expected_count, poisson_binomial_quantile)
+import numpy as np
+
+NUM_STOCHASTIC_CANDIDATES: int = 10
+ADP_NOISE_PICKS: float = 3
+SOFTMAX_TEMPERATURE: float = 1.5
+NUM_ROLLOUT_CANDIDATES: int = 6
+NUM_LISTED_CANDIDATES: int = 10
+NUM_SHOWN_OPTIONS: int = 5
 
 
 def pick_best_player(draft: "Draft") -> Player:
@@ -12,16 +24,38 @@ def allow_player_pick(draft: "Draft") -> Player:
     drafter: DraftedTeam = draft.current_drafter()
 
     while True:
-        selection: Player | None = get_player_from_input(draft.available_players, input(
-                f"enter {drafter.drafter_name} pick {draft.current_round_number+1}"
-                " <position> <initials>: "))
+        given_input: str = input(f"enter {drafter.drafter_name} pick {draft.current_round_number+1}"
+                                 " <position> <initials or name>: ")
+        candidates: list[Player] = get_players_from_input(draft, given_input)
         
-        if selection is None:
-            print("could not find a player of that position with those initials. Try again.")
-        else:
-            break
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if candidates == []:
+            candidates = draft.player_lookup.find_close(given_input)
+            if candidates == []:
+                print("could not find a player of that position with those initials or that name. Try again.")
+                continue
+            print("no exact match, did you mean:")
+
+        selection: Player | None = choose_candidate(candidates)
+        if selection is not None:
+            return selection
+
+
+def choose_candidate(candidates: list[Player]) -> Player | None:
+    if len(candidates) > NUM_LISTED_CANDIDATES:
+        print(f"{len(candidates)} players match, showing the best {NUM_LISTED_CANDIDATES}:")
+        candidates = candidates[:NUM_LISTED_CANDIDATES]
+
+    for candidate_number, candidate in enumerate(candidates, 1):
+        print(f"{candidate_number}: {candidate}")
 
-    return selection
+    choice: str = input(f"which one? (1-{len(candidates)}, or enter to search again): ")
+    if choice.isdigit() and 1 <= int(choice) <= len(candidates):
+        return candidates[int(choice) - 1]
+
+    return None
 
 
 def pick_best_player_vacant_position(draft: "Draft") -> Player:
@@ -31,7 +65,7 @@ def pick_best_player_vacant_position(draft: "Draft") -> Player:
 
     pick_candidates: list[Player] = []
 
-    for position in non_full_positions:
+    for position in in_position_order(non_full_positions, draft.league):
         pick_candidates.extend(draft.available_at_position(position))
     
     pick_candidates.sort(key=player_expected_score)
@@ -42,57 +76,155 @@ def pick_best_player_vacant_position(draft: "Draft") -> Player:
         return pick_candidates[0]
     
 
-@lru_cache(maxsize=None)
-def binom_quantile(percentile: float, trials: int, trial_proportion: float):
-    return int(binom.ppf(percentile, trials, trial_proportion))
+def vacant_position_candidates(draft: "Draft", num_candidates: int) -> list[Player]:
+    pick_candidates: list[Player] = []
+
+    for position in in_position_order(draft.current_drafter().get_non_full_positions(), draft.league):
+        pick_candidates.extend(draft.available_by_position[position].top(num_candidates))
+
+    if pick_candidates == []:
+        return draft.available_players.top(num_candidates)
+
+    pick_candidates.sort(key=player_expected_score)
+    return pick_candidates[:num_candidates]
+
+
+def pick_best_value_over_replacement(draft: "Draft") -> Player:
+    # the best player at each position still needed, compared across positions by how far they are above what's
+    # left once the league's starters at their position are gone. backups are only taken up to the usual caps,
+    # so a few drafters using this can't drain a position
+    drafter: DraftedTeam = draft.current_drafter()
+    positions: list[str] = in_position_order(drafter.get_non_full_positions(), draft.league)
+    if positions == []:
+        positions = [position for position in get_base_positions(draft.league)
+                     if drafter.num_at_position(position) < draft.league.backup_caps[position]]
+
+    pick_candidates: list[Player] = [draft.best_at_position(position) for position in positions
+                                     if len(draft.available_by_position[position]) > 0]
+    if pick_candidates == []:
+        return pick_best_player(draft)
+
+    return max(pick_candidates, key=draft.vor.value)
+
+
+def pick_noisy_adp(draft: "Draft") -> Player:
+    # treat the ranking by projected points as ADP and let each drafter reach or slide a few picks from it
+    pick_candidates: list[Player] = vacant_position_candidates(draft, NUM_STOCHASTIC_CANDIDATES)
+
+    adps: np.ndarray = np.array([draft.available_players.rank_by_player[player] for player in pick_candidates])
+    noisy_adps: np.ndarray = adps + draft.rng.normal(0, ADP_NOISE_PICKS, len(pick_candidates))
+
+    return pick_candidates[int(np.argmin(noisy_adps))]
+
+
+def pick_softmax_projection(draft: "Draft") -> Player:
+    pick_candidates: list[Player] = vacant_position_candidates(draft, NUM_STOCHASTIC_CANDIDATES)
+
+    scores: np.ndarray = np.array([player.expected_gamely_score for player in pick_candidates])
+    weights: np.ndarray = np.exp((scores - scores.max()) / SOFTMAX_TEMPERATURE)
+
+    return pick_candidates[int(draft.rng.choice(len(pick_candidates), p=weights / weights.sum()))]
+
+
+def pick_rollout(draft: "Draft") -> Player:
+    return search_candidates(draft, vacant_position_candidates(draft, NUM_ROLLOUT_CANDIDATES), rollout_policies(draft))
+
+
+def rollout_policies(draft: "Draft") -> list[DraftStrategy]:
+    # opponents keep their own strategy where it can run unattended, and we fill out our roster cheaply
+    policies: list[DraftStrategy] = []
+
+    for drafter in draft.teams:
+        if drafter is draft.current_drafter():
+            policies.append(get_strategy("greedy_vacant"))
+        elif drafter.strategy.automated and not drafter.strategy.time_budgeted:
+            policies.append(drafter.strategy)
+        else:
+            policies.append(get_strategy("noisy_adp"))
+
+    return policies
+
+
+def binom_quantile(percentile: float, trial_proportions: tuple[float, ...]) -> int:
+    # one trial per pick, each with its own chance of taking the position. when every chance is the same it's a
+    # plain binomial, which is looked up in a table
+    if len(set(trial_proportions)) <= 1:
+        return binomial_quantile(percentile, len(trial_proportions), trial_proportions[0] if trial_proportions else 0)
+
+    return poisson_binomial_quantile(percentile, trial_proportions)
+
+
+def draft_shares_before_next_pick(draft: "Draft") -> list[dict[str, float]]:
+    # the league's share of picks going to each position, for every pick before the current drafter's next one,
+    # less the positions the drafter making it has no use for. the drafters between picks each pick twice, once
+    # either side of the turn, unless the current drafter is at the turn themselves
+    draft_shares: dict[str, float] = draft.league.draft_shares
+    picks_each: int = 2 if draft.picks_until_next() != 0 else 1
+    shares_by_pick: list[dict[str, float]] = []
+
+    for team in drafters_before_next_pick(draft):
+        likelihood_each_position_taken: dict[str, float] = likelihood_for_position_counts(team.league,
+                                                                                          team.position_counts())
+        drafter_shares: dict[str, float] = {position: share if likelihood_each_position_taken[position] > 0 else 0
+                                            for position, share in draft_shares.items()}
+        shares_by_pick += [drafter_shares] * picks_each
+
+    return shares_by_pick
+
+
+INSTRUMENTATION.register_cache("binomial_quantile_table", binomial_quantile_table)
+INSTRUMENTATION.register_cache("poisson_binomial_distribution", poisson_binomial_distribution)
     
 
 def pick_most_volatile_position(draft: "Draft") -> Player:
-    PRINT_DEBUG_INFO: bool = False
+    PRINT_DEBUG_INFO: bool = INSTRUMENTATION.debug_output
     drafter: DraftedTeam = draft.current_drafter()
+    league: LeagueConfig = draft.league
 
-    non_full_positions: list[str] = list(drafter.get_non_full_positions())
+    non_full_positions: list[str] = in_position_order(drafter.get_non_full_positions(), league)
 
     if non_full_positions == []:
         return pick_best_player(draft)
     
     #TODO fix flex. shouldn't draft two TE
-    if drafter.get_players_at_position("FLEX") == []:
-        for position in FLEX_POSITIONS:
-            if len(drafter.get_players_at_position(position)) == POSITION_NUM_MAPPING[position]:
-                non_full_positions.remove(position)
-                if "FLEX" not in non_full_positions:
-                    non_full_positions.append("FLEX")
+    for flex_slot, eligible_positions in league.flex_slots.items():
+        if drafter.num_at_position(flex_slot) < league.slot_counts[flex_slot]:
+            for position in eligible_positions:
+                if drafter.num_at_position(position) == league.slot_counts[position]\
+                        and position in non_full_positions:
+                    non_full_positions.remove(position)
+                    if flex_slot not in non_full_positions:
+                        non_full_positions.append(flex_slot)
 
     best_player_by_position: dict[str, Player] = {}
     for position in non_full_positions:
-        if position == "FLEX":
+        if position in league.flex_slots:
             available_flex_players: list[Player] = []
-            for flex_position in FLEX_POSITIONS:
-                if len(drafter.get_players_at_position(flex_position)) == POSITION_NUM_MAPPING[flex_position]:
+            for flex_position in league.flex_slots[position]:
+                if drafter.num_at_position(flex_position) == league.slot_counts[flex_position]:
                     available_flex_players.extend(draft.available_at_position(flex_position))
 
             available_flex_players.sort(key=player_expected_score)
             best_player_by_position[position] = available_flex_players[0]
             continue
 
-        best_player_by_position[position] = draft.available_at_position(position)[0]
+        best_player_by_position[position] = draft.best_at_position(position)
 
-    proportion_positions_taken: dict[str, float] = {"QB": .175, "RB": .35, "WR": .35, "TE": .15, "SK": .07, "AR": .07}
+    shares_by_pick: list[dict[str, float]] = draft_shares_before_next_pick(draft)
+    proportions_position_taken: dict[str, tuple[float, ...]] = {
+            position: tuple(drafter_shares[position] for drafter_shares in shares_by_pick)
+            for position in league.draft_shares}
     best_player_by_position_next: dict[str, Player] = {}
-    picks_until_next: int = draft.picks_until_next()
-    picks_until_next = picks_until_next if picks_until_next != 0 else draft.num_drafters - 1
 
     times_flex_positions_picked: dict[str, int] = {}
-    for flex_position in FLEX_POSITIONS:
-        proportion_position_taken: float = proportion_positions_taken[flex_position]
-        times_flex_positions_picked[flex_position] = binom_quantile(.5, picks_until_next, proportion_position_taken)
+    for flex_position in league.flex_positions:
+        times_flex_positions_picked[flex_position] = binom_quantile(.5, proportions_position_taken[flex_position])
 
     for position in non_full_positions:
-        if position == "FLEX":
+        if position in league.flex_slots:
             pre_available_flex_players: list[Player] = []
-            for flex_position in FLEX_POSITIONS:
-                if len(drafter.get_players_at_position(flex_position)) == POSITION_NUM_MAPPING[flex_position]:
+            for flex_position in league.flex_slots[position]:
+                if drafter.num_at_position(flex_position) == league.slot_counts[flex_position]:
                     times_flex_position_picked = times_flex_positions_picked[flex_position]
                     pre_available_flex_players += draft.available_at_position(flex_position)[times_flex_position_picked:]
 
@@ -102,12 +234,11 @@ def pick_most_volatile_position(draft: "Draft") -> Player:
             continue
 
 
-        proportion_position_taken: float = proportion_positions_taken[position]
-        times_position_picked: int = binom_quantile(.5, picks_until_next, proportion_position_taken)
-        if position in FLEX_POSITIONS:
+        times_position_picked: int = binom_quantile(.5, proportions_position_taken[position])
+        if position in league.flex_positions:
             times_flex_positions_picked[position] = times_position_picked
 
-        best_player_after_picks: Player = draft.available_at_position(position)[times_position_picked]
+        best_player_after_picks: Player = draft.nth_best_at_position(position, times_position_picked)
         best_player_by_position_next[position] = best_player_after_picks
 
     value_lost_by_position: dict[str, float] = {}
@@ -118,101 +249,76 @@ def pick_most_volatile_position(draft: "Draft") -> Player:
     most_volatile_position = sorted(value_lost_by_position.items(), key=lambda item: -item[1])[0][0]
 
     if PRINT_DEBUG_INFO:
+        print([(position, round(poisson_binomial_expected_count(proportions_position_taken[position]), 2))
+               for position in non_full_positions if position in proportions_position_taken])
         print(list(map(lambda x: x[1].name, best_player_by_position.items())))
         print(list(map(lambda x: x[1].name, best_player_by_position_next.items())))
         print(list(map(lambda x: (x[0], round(x[1], 3)), value_lost_by_position.items())))
-        if "FLEX" in non_full_positions:
+        if any(position in league.flex_slots for position in non_full_positions):
             print([player.name for player in available_flex_players[:8]]) # type: ignore
 
     return best_player_by_position[most_volatile_position]
 
 
 def pick_volatile_position_predictive(draft: "Draft") -> Player:
-    PRINT_DEBUG_INFO: bool = False
-    drafter: DraftedTeam = draft.current_drafter()
-    base_positions: list[str] = get_base_positions()
-    
-    num_positions_picked_distribution: dict[str, dict[int, float]] = {}
-    for position in base_positions:
-        num_positions_picked_distribution[position] = {0: 1}
-
-    if draft.snaking_forward():
-        players_between_picks: list[DraftedTeam] = draft.teams[draft.current_drafter_index + 1:]
-    else:
-        players_between_picks: list[DraftedTeam] = draft.teams[:draft.current_drafter_index]
+    suggested_player, expected_loss_by_position = predictive_recommendation(draft)
 
-    if players_between_picks == []:
-        players_between_picks = draft.teams[:]
-        players_between_picks.remove(drafter)
+    if INSTRUMENTATION.debug_output or draft.print_picks:
+        print_expected_losses(expected_loss_by_position)
 
-    if PRINT_DEBUG_INFO:
-        print(f"{[team.drafter_name for team in players_between_picks]} going next")
+    return suggested_player
 
-    update_position_distribution(num_positions_picked_distribution, players_between_picks, PRINT_DEBUG_INFO)
 
-    if PRINT_DEBUG_INFO:
-        print([(position, [(num, round(proportion, 4))for num, proportion in distribution.items()])
-               for position, distribution in num_positions_picked_distribution.items()])
-        
-    expected_loss_by_position: dict[str, float] = {}
-    for position in base_positions:
-        expected_loss_by_position[position] = 0
-        players_at_position: list[Player] = draft.available_at_position(position)
-        best_player_position_skill = players_at_position[0].expected_gamely_score
-        position_picked_distribution = num_positions_picked_distribution[position]
+def print_expected_losses(expected_loss_by_position: dict[str, float]) -> None:
+    print([(position, round(loss, 4)) for position, loss in expected_loss_by_position.items()])
 
-        for pick_number_possibility, likelihood in position_picked_distribution.items():
-            that_player_skill = players_at_position[pick_number_possibility].expected_gamely_score
-
-            expected_loss_by_position[position] += (best_player_position_skill - that_player_skill) * likelihood
 
+# the suggested player along with every position's expected loss, kept apart from printing so the
+# recommendation can be worked out ahead of time on another thread
+def predictive_recommendation(draft: "Draft", num_positions_picked_distribution: np.ndarray | None = None)\
+        -> tuple[Player, dict[str, float]]:
+    PRINT_DEBUG_INFO: bool = INSTRUMENTATION.debug_output
+    drafter: DraftedTeam = draft.current_drafter()
+    base_positions: list[str] = get_base_positions(draft.league)
     
-    non_full_positions: set[str] = drafter.get_non_full_positions()
-
-    #TODO make work with flex better
-    for bad_flex_position in ("TE", "RB"):
-        if drafter.get_players_at_position("FLEX") == [] and\
-                len(drafter.get_players_at_position(bad_flex_position)) == POSITION_NUM_MAPPING[bad_flex_position] and\
-                draft.available_at_position(bad_flex_position)[0].expected_gamely_score\
-                < draft.available_at_position("WR")[0].expected_gamely_score:
-            non_full_positions.remove(bad_flex_position)
+    players_between_picks: list[DraftedTeam] = drafters_before_next_pick(draft)
 
+    if PRINT_DEBUG_INFO:
+        print(f"{[team.drafter_name for team in players_between_picks]} going next")
 
-    for position in expected_loss_by_position:
-        if len(drafter.get_players_at_position(position)) == POSITION_NUM_MAPPING[position] - 1\
-                and not drafting_backups(drafter):
-            expected_loss_by_position[position] -= .2
+    if num_positions_picked_distribution is None:
+        num_positions_picked_distribution = position_distribution_array(players_between_picks, base_positions)
 
-    print([(position, round(loss, 4)) for position, loss in expected_loss_by_position.items()])
+    if PRINT_DEBUG_INFO:
+        print([(position, [(num, round(proportion, 4)) for num, proportion in enumerate(distribution)
+                           if proportion > .0001])
+               for position, distribution in zip(base_positions, num_positions_picked_distribution)])
+        
+    all_expected_losses: dict[str, float] = {
+            position: adjusted_expected_loss(drafter, position, expected_loss) for position, expected_loss
+            in get_expected_loss_by_position(draft, num_positions_picked_distribution, base_positions).items()}
 
-    for position in base_positions:
-        if position not in non_full_positions and not drafting_backups(drafter):
-            del expected_loss_by_position[position]
+    considered_positions: set[str] = recommendation_positions(draft)
+    expected_loss_by_position: dict[str, float] = {position: expected_loss for position, expected_loss
+                                                   in all_expected_losses.items() if position in considered_positions}
 
     if expected_loss_by_position == {}:
-        return pick_best_player(draft)
+        return pick_best_player(draft), all_expected_losses
 
     most_volatile_position: str = sorted(expected_loss_by_position.items(), key=lambda x: -x[1])[0][0]
-    return draft.available_at_position(most_volatile_position)[0]
+    return draft.best_at_position(most_volatile_position), all_expected_losses
     
 
 def testing_strategy_1(draft: "Draft") -> Player:
-    PRINT_DEBUG_INFO: bool = True
+    PRINT_DEBUG_INFO: bool = INSTRUMENTATION.debug_output
     drafter: DraftedTeam = draft.current_drafter()
-    base_positions: list[str] = get_base_positions()
+    base_positions: list[str] = get_base_positions(draft.league)
     
     num_positions_picked_distribution: dict[str, dict[int, float]] = {}
     for position in base_positions:
         num_positions_picked_distribution[position] = {0: 1}
 
-    if draft.snaking_forward():
-        players_between_picks: list[DraftedTeam] = draft.teams[draft.current_drafter_index + 1:]
-    else:
-        players_between_picks: list[DraftedTeam] = draft.teams[:draft.current_drafter_index]
-
-    if players_between_picks == []:
-        players_between_picks = draft.teams[:]
-        players_between_picks.remove(drafter)
+    players_between_picks: list[DraftedTeam] = drafters_before_next_pick(draft)
 
     if PRINT_DEBUG_INFO:
         #print(f"{[team.drafter_name for team in players_between_picks]} going next")
@@ -227,13 +333,19 @@ def testing_strategy_1(draft: "Draft") -> Player:
 
     expected_loss_by_position: dict[str, float] = {}
     for position in base_positions:
+        # once more players could be taken than are left, the last one left is what we'd end up with, and a
+        # position that's run dry can't be picked from at all
+        last_available_index: int = draft.available_by_position[position].num_available - 1
+        if last_available_index < 0:
+            continue
+
         expected_loss_by_position[position] = 0
-        players_at_position: list[Player] = draft.available_at_position(position)
-        best_player_position_skill = players_at_position[0].expected_gamely_score
+        best_player_position_skill = draft.best_at_position(position).expected_gamely_score
         position_picked_distribution = num_positions_picked_distribution[position]
 
         for pick_number_possibility, likelihood in position_picked_distribution.items():
-            that_player_skill = players_at_position[pick_number_possibility].expected_gamely_score
+            that_player_skill = draft.nth_best_at_position(
+                    position, min(pick_number_possibility, last_available_index)).expected_gamely_score
 
             expected_loss_by_position[position] += (best_player_position_skill - that_player_skill) * likelihood
 
@@ -241,45 +353,86 @@ def testing_strategy_1(draft: "Draft") -> Player:
     non_full_positions: set[str] = drafter.get_non_full_positions()
 
     #TODO make work with flex better
-    for bad_flex_position in ("TE", "RB"):
-        if drafter.get_players_at_position("FLEX") == [] and\
-                len(drafter.get_players_at_position(bad_flex_position)) == POSITION_NUM_MAPPING[bad_flex_position] and\
-                draft.available_at_position(bad_flex_position)[0].expected_gamely_score\
-                < draft.available_at_position("WR")[0].expected_gamely_score:
-            non_full_positions.remove(bad_flex_position)
+    remove_bad_flex_positions(draft, non_full_positions)
 
 
     for position in base_positions:
         if position not in non_full_positions:
-            del expected_loss_by_position[position]
+            expected_loss_by_position.pop(position, None)
 
     if expected_loss_by_position == {}:
         return pick_best_player(draft)
     
     for position in expected_loss_by_position:
-        if len(drafter.get_players_at_position(position)) == POSITION_NUM_MAPPING[position] - 1:
+        if drafter.num_at_position(position) == draft.league.slot_counts[position] - 1:
             expected_loss_by_position[position] -= .2
 
     if PRINT_DEBUG_INFO:
         print([(position, round(loss, 4)) for position, loss in expected_loss_by_position.items()])
     
     most_volatile_position: str = sorted(expected_loss_by_position.items(), key=lambda x: -x[1])[0][0]
-    return draft.available_at_position(most_volatile_position)[0]
+    return draft.best_at_position(most_volatile_position)
+
+
+# the predictive suggestion plus the best few options to show alongside it, both from one distribution
+def manual_recommendation(draft: "Draft", num_positions_picked_distribution: np.ndarray | None = None,
+                          reused_evaluations: dict[str, list[CandidateEvaluation]] | None = None)\
+        -> ManualRecommendation:
+    if num_positions_picked_distribution is None:
+        num_positions_picked_distribution = position_distribution_array(drafters_before_next_pick(draft),
+                                                                        get_base_positions(draft.league))
+
+    suggested_player, expected_loss_by_position = predictive_recommendation(draft, num_positions_picked_distribution)
+    lineup: Lineup = projected_lineup(draft)
+    return ManualRecommendation(suggested_player, expected_loss_by_position, num_positions_picked_distribution, lineup,
+                                evaluate_positions(draft, NUM_SHOWN_OPTIONS, num_positions_picked_distribution,
+                                                   lineup, reused_evaluations), NUM_SHOWN_OPTIONS)
+
+
+def patch_manual_recommendation(draft: "Draft", recommendation: ManualRecommendation,
+                                changed_positions: set[str]) -> ManualRecommendation:
+    # a recommendation worked out for a state where the same drafters took the same positions, so the distribution
+    # is the same and only the positions whose players differ need their candidates worked out again, along with
+    # any the recommendation stopped or started considering. if a position's replacement level moved, so did the
+    # projected lineup every candidate is measured against, and none of them are kept
+    considered_positions: set[str] = recommendation_positions(draft)
+    reused_evaluations: dict[str, list[CandidateEvaluation]] = {}
+    if projected_lineup(draft).score == recommendation.projected_lineup.score:
+        reused_evaluations = {position: evaluations for position, evaluations
+                              in recommendation.evaluations_by_position.items() if position not in changed_positions
+                              and evaluations[0].fills_need == (position in considered_positions)}
+
+    return manual_recommendation(draft, recommendation.num_positions_picked_distribution, reused_evaluations)
 
 
 def manual_predictive(draft: "Draft") -> Player:
-    suggested_player: Player = pick_volatile_position_predictive(draft)
-    print(f"you should pick {suggested_player.position} {suggested_player.name}")
+    if draft.speculator is not None and draft.speculator.drafter_index == draft.current_drafter_index:
+        # usually already worked out while the other drafters were picking
+        recommendation: ManualRecommendation = draft.speculator.recommendation(draft)
+    else:
+        recommendation = manual_recommendation(draft)
+
+    if INSTRUMENTATION.debug_output or draft.print_picks:
+        print_expected_losses(recommendation.expected_loss_by_position)
+
+    print("best options:")
+    for option in recommendation.options:
+        print(f"  {option}")
+    print(f"you should pick {recommendation.suggested_player.position} {recommendation.suggested_player.name}")
     return allow_player_pick(draft)
 
 
 ALL_STRATEGIES: list[DraftStrategy] = [DraftStrategy("greedy", pick_best_player),
-                                       DraftStrategy("manual", allow_player_pick),
+                                       DraftStrategy("manual", allow_player_pick, False),
                                        DraftStrategy("greedy_vacant", pick_best_player_vacant_position),
                                        DraftStrategy("volatile", pick_most_volatile_position),
-                                       DraftStrategy("predictive", pick_volatile_position_predictive),
-                                       DraftStrategy("manual_predictive", manual_predictive),
-                                       DraftStrategy("test", testing_strategy_1)]
+                                       DraftStrategy("predictive", pick_volatile_position_predictive, heavy=True),
+                                       DraftStrategy("manual_predictive", manual_predictive, False, heavy=True),
+                                       DraftStrategy("test", testing_strategy_1, heavy=True),
+                                       DraftStrategy("noisy_adp", pick_noisy_adp),
+                                       DraftStrategy("softmax", pick_softmax_projection),
+                                       DraftStrategy("rollout", pick_rollout, time_budgeted=True),
+                                       DraftStrategy("vor", pick_best_value_over_replacement)]
 
 def get_strategy(name: str) -> DraftStrategy:
     for strategy in ALL_STRATEGIES:
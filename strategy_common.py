@@ -1,4 +1,7 @@
 from players import Player
+from league import LeagueConfig, BENCH_SLOT, DEFAULT_LEAGUE
+from lineup import Lineup, best_lineup, empty_lineup, lineup_with_player
+from bisect import insort
 from typing import Callable, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -7,62 +10,137 @@ if TYPE_CHECKING:
 
 player_expected_score: Callable[[Player], float] = lambda player: -player.expected_gamely_score
 
-POSITION_NUM_MAPPING: dict[str, int] = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "AR": 1, "SK": 1, "BENCH": 7}
-FLEX_POSITIONS: tuple[str, str, str] = ("WR", "RB", "TE")
-
 class DraftStrategy:
-    def __init__(self, name: str, strategy: Callable[["Draft"], Player]):
+    def __init__(self, name: str, strategy: Callable[["Draft"], Player], automated: bool = True,
+                 time_budgeted: bool = False, heavy: bool = False):
         self.name: str = name
         self.strategy: Callable[["Draft"], Player] = strategy
+        self.automated: bool = automated
+        # thinks for a fixed time every pick on a pool of its own, so it's left out of anything that runs many
+        # drafts at once unless asked for by name
+        self.time_budgeted: bool = time_budgeted
+        # picks take milliseconds of work, long enough to hold up an event loop running other drafts
+        self.heavy: bool = heavy
 
 
 class DraftedTeam:
-    def __init__(self, drafter_name: str, strategy: DraftStrategy):
+    __slots__ = ("drafter_name", "players", "strategy", "league", "players_by_position", "_lineups")
+
+    def __init__(self, drafter_name: str, strategy: DraftStrategy, league: LeagueConfig = DEFAULT_LEAGUE):
         self.drafter_name: str = drafter_name
         self.players: list[Player] = []
         self.strategy: DraftStrategy = strategy
+        self.league: LeagueConfig = league
+        self.players_by_position: dict[str, list[Player]] = {slot: [] for slot in league.slots}
+        # the best lineup after each pick, so undoing one during lookahead just drops the last. may hold only the
+        # latest lineup after add_players
+        self._lineups: list[Lineup] = [empty_lineup(league)]
+
+
+    def add_player(self, player: Player) -> None:
+        self.players.append(player)
+        insort(self.players_by_position.setdefault(player.position, []), player, key=player_expected_score)
+
+        if player.position in self.league.flex_positions:
+            self._update_flex_players()
+
+        self._lineups.append(lineup_with_player(self.league, self._lineups[-1], player))
+
+
+    def add_players(self, players: list[Player]) -> None:
+        # same as adding them one at a time, but each position is sorted and the lineup worked out once at the end
+        players_by_position: dict[str, list[Player]] = self.players_by_position
+        unsorted_positions: set[str] = {position for position, position_players in players_by_position.items()
+                                        if position_players != [] and position not in self.league.flex_slots}
+        self.players.extend(players)
+        for player in sorted(players, key=player_expected_score):
+            players_by_position.setdefault(player.position, []).append(player)
+
+        # positions that started out empty were filled best first, so only the rest need sorting
+        for position in unsorted_positions:
+            players_by_position[position].sort(key=player_expected_score)
+
+        self._update_flex_players()
+        self._lineups = [best_lineup(self.league, self._lineup_candidates())]
+
+
+    def remove_last_player(self) -> Player:
+        player: Player = self.players.pop()
+        position_players: list[Player] = self.players_by_position[player.position]
+        del position_players[next(index for index, other in enumerate(position_players) if other is player)]
+
+        if player.position in self.league.flex_positions:
+            self._update_flex_players()
+
+        if len(self._lineups) > 1:
+            self._lineups.pop()
+        else:
+            self._lineups = [best_lineup(self.league, self._lineup_candidates())]
+
+        return player
+
+
+    def copy(self) -> "DraftedTeam":
+        team_copy: DraftedTeam = DraftedTeam(self.drafter_name, self.strategy, self.league)
+        team_copy.players = self.players[:]
+        team_copy.players_by_position = {position: players[:] for position, players in self.players_by_position.items()}
+        team_copy._lineups = self._lineups[:]
+
+        return team_copy
 
 
     def expected_gamely_score(self) -> float:
-        expected_score = 0
-        for position, num in POSITION_NUM_MAPPING.items():
-            if position in ("AR", "SK"):
-                continue
-            starting_position_players: list[Player] = self.get_players_at_position(position)[:num]
+        return self._lineups[-1].score
 
-            for starter in starting_position_players:
-                expected_score += starter.expected_gamely_score
 
-        return expected_score
+    def lineup(self) -> Lineup:
+        return self._lineups[-1]
     
     
     def get_players_at_position(self, position: str) -> list[Player]:
-        players: list = []
+        return self.players_by_position.get(position, [])
+    
 
-        flex_starters: list[Player] = []
-        if position == "FLEX":
-            flex_starters = self.get_players_at_position("RB")[:2] +\
-                    self.get_players_at_position("WR")[:2] + self.get_players_at_position("TE")[:1]
+    def num_at_position(self, position: str) -> int:
+        return len(self.players_by_position.get(position, []))
 
-        for player in self.players:
-            if player.position == position:
-                players.append(player)
 
-            elif position == "FLEX" and player.position in FLEX_POSITIONS and player not in flex_starters:
-                players.append(player)
+    def position_counts(self) -> tuple[int, ...]:
+        return tuple(len(self.players_by_position[slot]) for slot in self.league.slots)
+
+
+    def _lineup_candidates(self) -> list[Player]:
+        # nobody below a position's best max_starters could start over them
+        return [player for position, max_starters in self.league.max_starters.items()
+                for player in self.players_by_position[position][:max_starters]]
+
+
+    def _update_flex_players(self) -> None:
+        # a flex slot's players are whoever at its positions didn't make their own position's starting lineup,
+        # less anyone starting in a narrower flex slot that was filled first. drafters' need is worked out from how
+        # many there are, while the lineup that's scored is solved for separately
+        starting_in_flex: set[int] = set()
+
+        for flex_slot in self.league.flex_fill_order:
+            flex_players: list[Player] = sorted(
+                    (player for position in self.league.flex_slots[flex_slot]
+                     for player in self.players_by_position[position][self.league.slot_counts[position]:]
+                     if id(player) not in starting_in_flex), key=player_expected_score)
+
+            self.players_by_position[flex_slot] = flex_players
+            starting_in_flex.update(id(player) for player in flex_players[:self.league.slot_counts[flex_slot]])
+
 
-        return sorted(players, key=player_expected_score)
-    
-        
     def get_non_full_positions(self) -> set[str]:
         non_full_positions: set[str] = set()
 
-        for position, number in POSITION_NUM_MAPPING.items():
-            if len(self.get_players_at_position(position)) < number:
-                non_full_positions.add(position)
+        for slot, number in self.league.slot_counts.items():
+            if self.num_at_position(slot) < number:
+                non_full_positions.add(slot)
 
-        if "FLEX" in non_full_positions:
-            non_full_positions.remove("FLEX")
-            non_full_positions.update(FLEX_POSITIONS)
+        for flex_slot, eligible_positions in self.league.flex_slots.items():
+            if flex_slot in non_full_positions:
+                non_full_positions.remove(flex_slot)
+                non_full_positions.update(eligible_positions)
 
-        return set(non_full_positions) - {"BENCH"}
\ No newline at end of file
+        return set(non_full_positions) - {BENCH_SLOT}
\ No newline at end of file
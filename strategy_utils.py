@@ -1,102 +1,187 @@
 from strategy_common import *
+from instrumentation import INSTRUMENTATION
+from functools import lru_cache
 
+LIKELIHOOD_CACHE_SIZE: int = 4096
+# taken off a position's expected loss when the drafter only has its last starter left to fill
+LAST_STARTER_LOSS_DISCOUNT: float = .2
 
-def get_player_from_input(available_players: list[Player], given_input: str) -> Player | None:
-    try:
-        given_position: str = given_input.split(" ")[0].upper()
-        given_double_initials: str = given_input.split(" ")[1].upper()
 
-        entry_intention_map: dict[str, str] = {"K": "SK", "D": "AR", "D/ST": "AR", "DST": "AR"}
-        if given_position in entry_intention_map:
-            given_position = entry_intention_map[given_position]
+def get_players_from_input(draft: "Draft", given_input: str) -> list[Player]:
+    return draft.player_lookup.find(given_input)
+
+
+def drafters_before_next_pick(draft: "Draft") -> list[DraftedTeam]:
+    drafter: DraftedTeam = draft.current_drafter()
+
+    if draft.snaking_forward():
+        players_between_picks: list[DraftedTeam] = draft.teams[draft.current_drafter_index + 1:]
+    else:
+        players_between_picks: list[DraftedTeam] = draft.teams[:draft.current_drafter_index]
+
+    if players_between_picks == []:
+        players_between_picks = draft.teams[:]
+        players_between_picks.remove(drafter)
+
+    return players_between_picks
+
+
+def get_base_positions(league: LeagueConfig) -> list[str]:
+    return list(league.positions)
 
-        for player in available_players:
-            player_double_initials: str = "".join(name[0:2] for name in player.name.split(" "))
-            if player_double_initials.upper() == given_double_initials and player.position == given_position:
-                return player
-            
-    except Exception:
-        return None
-    
 
-def get_base_positions() -> list[str]:
-    positions: list[str] = []
-    for position in POSITION_NUM_MAPPING.keys():
-        if position not in ("FLEX", "BENCH"):
-            positions.append(position)
+def in_position_order(positions: set[str], league: LeagueConfig) -> list[str]:
+    # sets iterate in a different order in every process, which would break ties differently between runs
+    return [position for position in league.slots if position in positions]
 
-    return positions
+
+def counts_by_position(league: LeagueConfig, position_counts: tuple[int, ...]) -> dict[str, int]:
+    return dict(zip(league.slots, position_counts))
+
+
+def position_counts_after_pick(league: LeagueConfig, position_counts: tuple[int, ...],
+                               position: str) -> tuple[int, ...]:
+    num_at_position: dict[str, int] = counts_by_position(league, position_counts)
+    num_at_position[position] += 1
+
+    if position in league.flex_positions:
+        num_at_position.update(league.flex_counts(num_at_position))
+
+    return tuple(num_at_position.values())
+
+
+def remove_bad_flex_positions(draft: "Draft", non_full_positions: set[str]) -> None:
+    # while a flex slot is open, a position that's only still needed for it isn't worth taking once its best player
+    # is worse than the best at the slot's first position, which for a regular flex is WR
+    drafter: DraftedTeam = draft.current_drafter()
+    league: LeagueConfig = draft.league
+
+    for flex_slot, eligible_positions in league.flex_slots.items():
+        if drafter.num_at_position(flex_slot) >= league.slot_counts[flex_slot]:
+            continue
+
+        for bad_flex_position in eligible_positions[1:]:
+            if bad_flex_position in non_full_positions and\
+                    drafter.num_at_position(bad_flex_position) == league.slot_counts[bad_flex_position] and\
+                    draft.best_at_position(bad_flex_position).expected_gamely_score\
+                    < draft.best_at_position(eligible_positions[0]).expected_gamely_score:
+                non_full_positions.remove(bad_flex_position)
+
+
+def recommendation_positions(draft: "Draft") -> set[str]:
+    # the positions the predictive recommendation chooses between. once every starter is in, that's all of them
+    drafter: DraftedTeam = draft.current_drafter()
+    if drafting_backups(drafter):
+        return set(get_base_positions(draft.league))
+
+    non_full_positions: set[str] = drafter.get_non_full_positions()
+    #TODO make work with flex better
+    remove_bad_flex_positions(draft, non_full_positions)
+    return non_full_positions
+
+
+def adjusted_expected_loss(drafter: DraftedTeam, position: str, expected_loss: float) -> float:
+    if drafter.num_at_position(position) == drafter.league.slot_counts[position] - 1 and not drafting_backups(drafter):
+        return expected_loss - LAST_STARTER_LOSS_DISCOUNT
+
+    return expected_loss
 
 
 def drafting_backups(drafter: DraftedTeam) -> bool:
-    for position in ("QB", "WR", "RB", "TE", "FLEX"):
-        if len(drafter.get_players_at_position(position)) < POSITION_NUM_MAPPING[position]:
+    return _drafting_backups(drafter.league, counts_by_position(drafter.league, drafter.position_counts()))
+
+
+def _drafting_backups(league: LeagueConfig, num_at_position: dict[str, int]) -> bool:
+    for slot, number in league.scored_slots:
+        if num_at_position[slot] < number:
             return False
         
     return True
 
 
 def backups_likelihood(drafter: DraftedTeam) -> dict[str, float]:
-    total_caps: dict[str, int] = {"QB": 3, "WR": 7, "RB": 6, "TE": 3, "AR": 2, "SK": 2}
+    return _backups_likelihood(drafter.league, counts_by_position(drafter.league, drafter.position_counts()))
+
+
+def _backups_likelihood(league: LeagueConfig, num_at_position: dict[str, int]) -> dict[str, float]:
     picks_left_by_position: dict[str, int] = {}
 
-    for position, cap in total_caps.items():
-        picks_left_by_position[position] = max(cap - len(drafter.get_players_at_position(position)), 0)
+    for position, cap in league.backup_caps.items():
+        picks_left_by_position[position] = max(cap - num_at_position[position], 0)
 
     total_needed: int = sum(picks_left_by_position.values())
 
-    return {position: picks_left_by_position[position] / total_needed for position in total_caps}
+    return {position: picks_left_by_position[position] / total_needed for position in league.backup_caps}
 
 
 def get_likelihood_each_position_taken(drafter: DraftedTeam, print_debug = False) -> dict[str, float]:
-    positions: list[str] = get_base_positions()
+    league: LeagueConfig = drafter.league
+    position_counts: tuple[int, ...] = drafter.position_counts()
+    likelihood_each_position_taken: dict[str, float] = dict(likelihood_for_position_counts(league, position_counts))
 
-    if drafting_backups(drafter):
-        if print_debug:
-            print(f"{drafter.drafter_name} drafting backups")
+    if print_debug and _drafting_backups(league, counts_by_position(league, position_counts)):
+        print(f"{drafter.drafter_name} drafting backups")
 
-        return backups_likelihood(drafter)
+    elif print_debug:
+        num_at_position: dict[str, int] = counts_by_position(league, position_counts)
+        drafter_team_state: dict[str, int] = {position: num_at_position[position]
+                                              for position in get_base_positions(league)}
+        print(f"{drafter.drafter_name} has {drafter_team_state} so they take "
+            f"{[[position, round(likelihood, 4)] for position, likelihood in likelihood_each_position_taken.items()]}")
+        
+    return likelihood_each_position_taken
 
-    drafter_team_state: dict[str, int] = {}
 
-    for position in positions:
-        drafter_team_state[position] = len(drafter.get_players_at_position(position))
-    
-    POSITION_IMPORTANCES: dict[str, float] = {"QB": 1.25, "WR": 1.5, "RB": 1.5, "TE": .75, "AR": .001, "SK": .001}
+# a drafter's need only depends on how many players they have at each position, and only so many roster shapes
+# come up in a draft. shared between callers, so the returned dict must not be modified
+@lru_cache(maxsize=LIKELIHOOD_CACHE_SIZE)
+def likelihood_for_position_counts(league: LeagueConfig, position_counts: tuple[int, ...]) -> dict[str, float]:
+    positions: list[str] = get_base_positions(league)
+    num_at_position: dict[str, int] = counts_by_position(league, position_counts)
+
+    if _drafting_backups(league, num_at_position):
+        return _backups_likelihood(league, num_at_position)
 
     need_by_position: dict[str, float] = {}
     for position in positions:
-        need_by_position[position] = max((POSITION_NUM_MAPPING[position] - drafter_team_state[position])\
-                * POSITION_IMPORTANCES[position], 0)
-        
-    if drafter.get_players_at_position("FLEX") == []:
-        for flex_position in FLEX_POSITIONS:
-            if need_by_position[flex_position] == 0:
-                # give a bit of need if can be drafted at FLEX, even if otherwise full
-                flex_importances: dict[str, float] = {"WR": .8, "RB": .4, "TE": .05}
-                need_by_position[flex_position] = POSITION_IMPORTANCES[flex_position] * flex_importances[flex_position]
+        need_by_position[position] = max((league.slot_counts[position] - num_at_position[position])\
+                * league.position_importances[position], 0)
+
+    for flex_slot, eligible_positions in league.flex_slots.items():
+        if num_at_position[flex_slot] == 0:
+            for flex_position in eligible_positions:
+                if need_by_position[flex_position] == 0:
+                    # give a bit of need if can be drafted at a flex slot, even if otherwise full
+                    need_by_position[flex_position] = league.position_importances[flex_position]\
+                            * league.flex_importances[flex_position]
 
     total_need: float = sum(need_by_position.values())
     if total_need == 0:
-        return {position: 0 for position in get_base_positions()}
+        return {position: 0 for position in positions}
 
-    likelihood_each_position_taken: dict[str, float] = {position: need_by_position[position] / total_need\
-                                                        for position in positions}
-    
-    if print_debug:
-        print(f"{drafter.drafter_name} has {drafter_team_state} so they take "
-            f"{[[position, round(likelihood, 4)] for position, likelihood in likelihood_each_position_taken.items()]}")
-        
-    return likelihood_each_position_taken
+    return {position: need_by_position[position] / total_need for position in positions}
+
+
+INSTRUMENTATION.register_cache("likelihood_for_position_counts", likelihood_for_position_counts)
 
 
 def update_position_distribution_single(position_distribution: dict[str, dict[int, float]], drafter: DraftedTeam,
-                                        second: bool = False, weight: float = 1, print_debug: bool = False) -> None:
-    likelihood_each_position_taken: dict[str, float] = get_likelihood_each_position_taken(drafter,
-                                                       print_debug and (not second))
+                                        print_debug: bool = False) -> None:
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.count("distribution_updates")
+
+    likelihood_each_position_taken: dict[str, float] = get_likelihood_each_position_taken(drafter, print_debug)
+    add_pick_likelihoods(position_distribution, likelihood_each_position_taken)
+
+    position_counts: tuple[int, ...] = drafter.position_counts()
+    for position in position_distribution:
+        add_pick_likelihoods(position_distribution, likelihood_for_position_counts(
+                drafter.league, position_counts_after_pick(drafter.league, position_counts, position)),
+                             likelihood_each_position_taken[position])
 
-    drafter_copy: DraftedTeam = DraftedTeam("", drafter.strategy)
 
+def add_pick_likelihoods(position_distribution: dict[str, dict[int, float]],
+                         likelihood_each_position_taken: dict[str, float], weight: float = 1) -> None:
     for position in position_distribution:
         likelihood_position_taken = likelihood_each_position_taken[position]
         if likelihood_position_taken == 0 or weight == 0:
@@ -116,12 +201,6 @@ def update_position_distribution_single(position_distribution: dict[str, dict[in
             position_distribution[position][times_taken] += added_probability
             position_distribution[position][times_taken - 1] -= added_probability
 
-    if not second:
-        for position in position_distribution:
-            drafter_copy.players = drafter.players[:] + [Player("", position, 0)]
-            update_position_distribution_single(position_distribution, drafter_copy,
-                                                True, likelihood_each_position_taken[position])
-
 
 def update_position_distribution(position_distribution: dict[str, dict[int, float]],
                                 drafters_between: list[DraftedTeam], print_debug = False) -> None:
@@ -141,8 +220,6 @@ def test_update_position_distribution_single(position_distribution: dict[str, di
     likelihood_each_position_taken: dict[str, float] = test_get_likelihood_each_position_taken(drafter,
                                                        print_debug and (not second))
 
-    drafter_copy: DraftedTeam = DraftedTeam("", drafter.strategy)
-
     for position in position_distribution:
         likelihood_position_taken = likelihood_each_position_taken[position]
         if likelihood_position_taken == 0 or weight == 0:
@@ -165,13 +242,15 @@ def test_update_position_distribution_single(position_distribution: dict[str, di
     if not second:
 
         for position in position_distribution:
-            drafter_copy.players = drafter.players[:] + [Player("", position, 0)]
+            drafter_copy: DraftedTeam = drafter.copy()
+            drafter_copy.add_player(Player("", position, 0))
             new_distribution: dict[str, float] = get_likelihood_each_position_taken(drafter_copy)
             test_update_position_distribution_single(position_distribution, drafter_copy,
                                                 True, likelihood_each_position_taken[position])
             
 def test_get_likelihood_each_position_taken(drafter: DraftedTeam, print_debug = False) -> dict[str, float]:
-    positions: list[str] = get_base_positions()
+    league: LeagueConfig = drafter.league
+    positions: list[str] = get_base_positions(league)
 
     if drafting_backups(drafter):
         if print_debug:
@@ -181,25 +260,26 @@ def test_get_likelihood_each_position_taken(drafter: DraftedTeam, print_debug =
     drafter_team_state: dict[str, int] = {}
 
     for position in positions:
-        drafter_team_state[position] = len(drafter.get_players_at_position(position))
+        drafter_team_state[position] = drafter.num_at_position(position)
     
-    POSITION_IMPORTANCES: dict[str, float] = {"QB": 1.25, "WR": 1.5, "RB": 1.5, "TE": .75, "AR": .2, "SK": .2}
+    POSITION_IMPORTANCES: dict[str, float] = dict(league.position_importances, AR=.2, SK=.2)
 
     need_by_position: dict[str, float] = {}
     for position in positions:
-        need_by_position[position] = max((POSITION_NUM_MAPPING[position] - drafter_team_state[position])\
+        need_by_position[position] = max((league.slot_counts[position] - drafter_team_state[position])\
                 * POSITION_IMPORTANCES[position], 0)
-        
-    if drafter.get_players_at_position("FLEX") == []:
-        for flex_position in FLEX_POSITIONS:
-            if need_by_position[flex_position] == 0:
-                flex_importances: dict[str, float] = {"WR": .8, "RB": .4, "TE": .05}
-                # give a bit of need if can be drafted at FLEX, even if otherwise full
-                need_by_position[flex_position] = POSITION_IMPORTANCES[flex_position] * flex_importances[flex_position]
+
+    for flex_slot, eligible_positions in league.flex_slots.items():
+        if drafter.num_at_position(flex_slot) == 0:
+            for flex_position in eligible_positions:
+                if need_by_position[flex_position] == 0:
+                    # give a bit of need if can be drafted at a flex slot, even if otherwise full
+                    need_by_position[flex_position] = POSITION_IMPORTANCES[flex_position]\
+                            * league.flex_importances[flex_position]
 
     total_need: float = sum(need_by_position.values())
     if total_need == 0:
-        return {position: 0 for position in get_base_positions()}
+        return {position: 0 for position in positions}
 
     likelihood_each_position_taken: dict[str, float] = {position: need_by_position[position] / total_need\
                                                         for position in positions}
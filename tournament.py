@@ -0,0 +1,192 @@
+from draft import AutoDraft
+from league import DEFAULT_LEAGUE, ALL_LEAGUES, get_league
+from players import get_player_list
+from instrumentation import (INSTRUMENTATION, add_instrumentation_arguments, finish_instrumentation,
+                             start_instrumentation)
+from strategy import ALL_STRATEGIES, DraftedTeam, get_strategy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import mean, stdev
+from typing import Iterator
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import numpy as np
+
+CONFIDENCE_Z_SCORE: float = 1.96
+
+
+class DraftOutcome:
+    def __init__(self, testing_strategy_name: str, others_strategy_name: str, testing_position: int, replica: int,
+                 rank: int, expected_gamely_score: float, instrumentation: dict | None = None):
+        self.testing_strategy_name: str = testing_strategy_name
+        self.others_strategy_name: str = others_strategy_name
+        self.testing_position: int = testing_position
+        self.replica: int = replica
+        self.rank: int = rank
+        self.expected_gamely_score: float = expected_gamely_score
+        # what the worker recorded during this draft, when the tournament is instrumented
+        self.instrumentation: dict | None = instrumentation
+
+
+class PairingSummary:
+    def __init__(self, testing_strategy_name: str, others_strategy_name: str):
+        self.testing_strategy_name: str = testing_strategy_name
+        self.others_strategy_name: str = others_strategy_name
+        self.ranks: list[int] = []
+        self.expected_gamely_scores: list[float] = []
+
+
+    def add(self, outcome: DraftOutcome) -> None:
+        self.ranks.append(outcome.rank)
+        self.expected_gamely_scores.append(outcome.expected_gamely_score)
+
+
+    def mean_rank(self) -> float:
+        return mean(self.ranks)
+
+
+    def rank_confidence_interval(self) -> tuple[float, float]:
+        return confidence_interval(self.ranks)
+
+
+    def mean_expected_gamely_score(self) -> float:
+        return mean(self.expected_gamely_scores)
+
+
+    def to_dict(self) -> dict:
+        rank_low, rank_high = self.rank_confidence_interval()
+
+        return {"testing_strategy": self.testing_strategy_name, "others_strategy": self.others_strategy_name,
+                "drafts": len(self.ranks), "mean_rank": self.mean_rank(), "rank_ci_low": rank_low,
+                "rank_ci_high": rank_high, "mean_points_per_week": self.mean_expected_gamely_score()}
+
+
+class TournamentResults:
+    def __init__(self):
+        self.summaries: dict[tuple[str, str], PairingSummary] = {}
+
+
+    def add(self, outcome: DraftOutcome) -> None:
+        pairing: tuple[str, str] = (outcome.testing_strategy_name, outcome.others_strategy_name)
+        if pairing not in self.summaries:
+            self.summaries[pairing] = PairingSummary(*pairing)
+
+        self.summaries[pairing].add(outcome)
+
+
+    def to_dicts(self) -> list[dict]:
+        return [summary.to_dict() for summary in self.summaries.values()]
+
+
+    def print_results(self) -> None:
+        print(f"{'testing':<16}{'others':<16}{'drafts':>8}{'mean rank':>11}{'95% ci':>17}{'pts/week':>10}")
+
+        for summary in sorted(self.summaries.values(), key=lambda x: x.mean_rank()):
+            rank_low, rank_high = summary.rank_confidence_interval()
+            print(f"{summary.testing_strategy_name:<16}{summary.others_strategy_name:<16}{len(summary.ranks):>8}"
+                  f"{summary.mean_rank():>11.3f}{f'({rank_low:.2f}, {rank_high:.2f})':>17}"
+                  f"{summary.mean_expected_gamely_score():>10.2f}")
+
+
+def confidence_interval(values: list[float] | list[int]) -> tuple[float, float]:
+    if len(values) < 2:
+        return (values[0], values[0])
+
+    margin: float = CONFIDENCE_Z_SCORE * stdev(values) / math.sqrt(len(values))
+    return (mean(values) - margin, mean(values) + margin)
+
+
+def run_tournament_draft(testing_strategy_name: str, others_strategy_name: str, num_drafters: int,
+                         testing_position: int, replica: int, seed: np.random.SeedSequence,
+                         league_name: str = DEFAULT_LEAGUE.name, instrumented: bool = False,
+                         profiled: bool = False) -> DraftOutcome:
+    if instrumented:
+        INSTRUMENTATION.enable(profiled)
+        INSTRUMENTATION.reset()
+
+    draft: AutoDraft = AutoDraft(get_strategy(testing_strategy_name), get_strategy(others_strategy_name),
+                                 num_drafters, testing_position, seed, league=get_league(league_name))
+    tested_team: DraftedTeam = draft.teams[testing_position]
+
+    draft.print_picks = False
+    # strategies print as they go, which is only wanted when asked for with --debug
+    with contextlib.nullcontext() if INSTRUMENTATION.debug_output else contextlib.redirect_stdout(io.StringIO()):
+        draft.run_draft()
+
+    draft._sort_teams()
+    return DraftOutcome(testing_strategy_name, others_strategy_name, testing_position, replica,
+                        draft.teams.index(tested_team) + 1, tested_team.expected_gamely_score(),
+                        INSTRUMENTATION.snapshot() if instrumented else None)
+
+
+def tournament_tasks(strategy_names: list[str], num_drafters: int, replicas: int) -> Iterator[tuple]:
+    for testing_strategy_name in strategy_names:
+        for others_strategy_name in strategy_names:
+            for replica in range(replicas):
+                for testing_position in range(num_drafters):
+                    yield (testing_strategy_name, others_strategy_name, num_drafters, testing_position, replica)
+
+
+def run_tournament(strategy_names: list[str] | None = None, num_drafters: int = 10, replicas: int = 1,
+                   max_workers: int | None = None, print_progress: bool = False, seed: int = 0,
+                   league_name: str = DEFAULT_LEAGUE.name) -> TournamentResults:
+    if strategy_names is None:
+        strategy_names = [strategy.name for strategy in ALL_STRATEGIES
+                          if strategy.automated and not strategy.time_budgeted]
+
+    results: TournamentResults = TournamentResults()
+    tasks: list[tuple] = list(tournament_tasks(strategy_names, num_drafters, replicas))
+    # every draft gets its own independent stream, so results don't depend on which worker ran what
+    seeds: list[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(len(tasks))
+
+    # loaded once here so forked workers share this copy of the pool rather than each parsing the csv again and
+    # racing to rewrite its compiled cache. asked for by name since fork isn't the default everywhere
+    get_player_list()
+    fork_context: multiprocessing.context.BaseContext | None = multiprocessing.get_context("fork")\
+            if "fork" in multiprocessing.get_all_start_methods() else None
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=fork_context) as executor:
+        # workers record into their own copy of the instrumentation, which is merged back into this one
+        futures = [executor.submit(run_tournament_draft, *task, task_seed, league_name, INSTRUMENTATION.enabled,
+                                   INSTRUMENTATION.profiler is not None) for task, task_seed in zip(tasks, seeds)]
+
+        for completed, future in enumerate(as_completed(futures), 1):
+            outcome: DraftOutcome = future.result()
+            results.add(outcome)
+            if outcome.instrumentation is not None:
+                INSTRUMENTATION.merge(outcome.instrumentation)
+
+            if print_progress:
+                print(f"\r{completed}/{len(tasks)} drafts complete", end="", flush=True)
+
+    if print_progress:
+        print()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="pit every automated strategy against "
+                                                              "every other one from every draft position")
+    parser.add_argument("--strategies", nargs="+", help="strategy names to include (default all automated ones "
+                        "that don't think for a fixed time every pick)")
+    parser.add_argument("--drafters", type=int, default=10)
+    parser.add_argument("--replicas", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the summaries as json instead of a table")
+    parser.add_argument("--league", default=DEFAULT_LEAGUE.name, choices=[league.name for league in ALL_LEAGUES])
+    add_instrumentation_arguments(parser)
+    arguments: argparse.Namespace = parser.parse_args()
+
+    start_instrumentation(arguments)
+    results: TournamentResults = run_tournament(arguments.strategies, arguments.drafters, arguments.replicas,
+                                                arguments.workers, not arguments.json, arguments.seed, arguments.league)
+    finish_instrumentation(arguments)
+    if arguments.json:
+        print(json.dumps(results.to_dicts(), indent=2))
+    else:
+        results.print_results()
@@ -0,0 +1,70 @@
+from players import Player
+from league import LeagueConfig
+from player_index import PlayerIndex
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from draft import Draft
+
+
+class ValueOverReplacement:
+    # how far each player is above the best one at their position who won't end up starting anywhere in the
+    # league. a position's replacement level only moves when someone at that position is drafted or undrafted,
+    # so the draft updates just that position and every lookup is a dict access
+    def __init__(self, draft: "Draft"):
+        self.available_by_position: dict[str, PlayerIndex] = draft.available_by_position
+        self.num_starters: dict[str, int] = league_starter_counts(draft.league, draft.num_drafters,
+                                                                  draft.available_players.ranked_players)
+        self.replacement_scores: dict[str, float] = {}
+
+        for position in self.num_starters:
+            self.update(position)
+
+
+    def update(self, position: str) -> None:
+        if position not in self.num_starters:
+            return
+
+        position_index: PlayerIndex = self.available_by_position[position]
+        # everyone drafted at the position so far is assumed to have taken one of its starting spots
+        num_drafted: int = len(position_index.ranked_players) - position_index.num_available
+        starters_left: int = max(self.num_starters[position] - num_drafted, 0)
+
+        if starters_left < position_index.num_available:
+            self.replacement_scores[position] = position_index.kth_best(starters_left).expected_gamely_score
+        else:
+            self.replacement_scores[position] = 0
+
+
+    def value(self, player: Player) -> float:
+        return player.expected_gamely_score - self.replacement_score(player.position)
+
+
+    def replacement_score(self, position: str) -> float:
+        return self.replacement_scores.get(position, 0)
+
+
+def league_starter_counts(league: LeagueConfig, num_drafters: int, ranked_players: list[Player]) -> dict[str, int]:
+    # how many players at each position start across the whole league if everyone fields the best lineup they
+    # could from the pool. flex slots go to the best players left over after every position's own slots
+    players_by_position: dict[str, list[Player]] = {position: [] for position in league.positions}
+    for player in ranked_players:
+        if player.position in players_by_position:
+            players_by_position[player.position].append(player)
+
+    num_starters: dict[str, int] = {position: min(num_drafters * league.slot_counts[position],
+                                                  len(players_by_position[position]))
+                                    for position in league.positions}
+    starting_in_flex: set[int] = set()
+
+    for flex_slot in league.flex_fill_order:
+        flex_candidates: list[Player] = sorted(
+                (player for position in league.flex_slots[flex_slot]
+                 for player in players_by_position[position][num_drafters * league.slot_counts[position]:]
+                 if id(player) not in starting_in_flex), key=lambda x: -x.expected_gamely_score)
+
+        for player in flex_candidates[:num_drafters * league.slot_counts[flex_slot]]:
+            num_starters[player.position] += 1
+            starting_in_flex.add(id(player))
+
+    return num_starters